@@ -0,0 +1,5 @@
+"""
+Benchmarks of layout generation and rendering.
+
+Run with `python -m benchmarks`, see `python -m benchmarks -h`.
+"""
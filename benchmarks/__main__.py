@@ -0,0 +1,40 @@
+import sys
+import json
+
+from argparse import ArgumentParser
+
+from .suite import run, compare
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark all layouts across container sizes, item counts and radii.")
+    parser.add_argument("-o", "--output", help="file to write JSON results to. default: stdout")
+    parser.add_argument("-k", "--match", help="only run cases with names containing MATCH")
+    parser.add_argument("-n", "--repeat", type=int, default=3,
+                        help="number of runs of each case, the fastest is reported. default: 3")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure peak memory")
+    parser.add_argument("--no-large", action="store_true", help="skip the large-n tier")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare results against BASELINE JSON file and exit with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative growth reported as a regression. default: 0.2")
+    args = parser.parse_args()
+
+    def progress(result):
+        sys.stderr.write("%-45s %s\n" % (result["name"], result.get("error") or "%.4fs" % result["time"]))
+
+    report = run(args.repeat, not args.no_memory, args.match, progress, not args.no_large)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for name, metric, before, after in regressions:
+            sys.stderr.write("REGRESSION %s %s: %s -> %s\n" % (name, metric, before, after))
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,202 @@
+import gc
+import time
+import resource
+import platform
+
+from io import BytesIO
+from itertools import product
+from multiprocessing import Process, Queue
+
+from layouts import cache, horizontal_line_layout, grid_layout, circle_layout, random_layout, render
+from layouts.errors import LayoutError
+from layouts.compat import numpy
+
+
+CONTAINERS = [(100, 100), (400, 400), (1000, 200)]
+NUM_ITEMS = [5, 25, 100]
+RADII = [2, 5]
+
+# large-n tier, big enough to show the cost of pair checks and of
+# scanning every pixel of the container
+LARGE_CONTAINERS = [(400, 400), (20000, 20)]
+LARGE_NUM_ITEMS = [1000]
+LARGE_RADII = [2]
+
+# random layouts are benchmarked with every engine
+LAYOUTS = [
+    ("horizontal_line", {}),
+    ("grid", {}),
+    ("circle", {}),
+    ("random", {"engine": "pixels"}),
+    ("random", {"engine": "poisson"}),
+    ("random", {"engine": "bitmap"}),
+    ("random", {"engine": "parallel"}),
+]
+
+LAYOUT_FUNCTIONS = {
+    "horizontal_line": horizontal_line_layout,
+    "grid": grid_layout,
+    "circle": circle_layout,
+    "random": random_layout,
+}
+
+
+class Case(object):
+    """
+    Layout of num_items circles of radius in container of width *
+    height.
+    """
+    def __init__(self, kind, options, width, height, num_items, radius):
+        self.kind = kind
+        self.options = options
+        self.width = width
+        self.height = height
+        self.num_items = num_items
+        self.radius = radius
+
+    @property
+    def name(self):
+        kind = self.kind
+        if "engine" in self.options:
+            kind = "%s-%s" % (kind, self.options["engine"])
+        return "%s/%dx%d/n=%d/r=%d" % (kind, self.width, self.height, self.num_items, self.radius)
+
+    def layout(self):
+        """
+        Returns items arranged by the public layout function, cached
+        results are discarded first so every call does the work.
+        """
+        cache.invalidate()
+        function = LAYOUT_FUNCTIONS[self.kind]
+        return function(self.width, self.height, self.num_items, radius=self.radius, **self.options)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "layout": self.kind,
+            "width": self.width,
+            "height": self.height,
+            "num_items": self.num_items,
+            "radius": self.radius,
+        }
+
+
+def cases(large=True):
+    matrix = [(CONTAINERS, NUM_ITEMS, RADII)]
+    if large:
+        matrix.append((LARGE_CONTAINERS, LARGE_NUM_ITEMS, LARGE_RADII))
+
+    for containers, num_items_list, radii in matrix:
+        for (kind, options), (width, height), num_items, radius in product(LAYOUTS, containers,
+                                                                           num_items_list, radii):
+            yield Case(kind, options, width, height, num_items, radius)
+
+
+def best_time(function, repeat):
+    """
+    Returns the shortest of repeat runs of function in seconds.
+    """
+    times = []
+    for i in range(0, repeat):
+        gc.collect()
+        started = time.time()
+        function()
+        times.append(time.time() - started)
+    return min(times)
+
+
+def peak_memory(function):
+    """
+    Returns growth of peak resident memory in KB while running function
+    in a child process, so earlier runs don't hide the peak.
+    """
+    def child(queue):
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        function()
+        queue.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+    queue = Queue()
+    process = Process(target=child, args=(queue, ))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_case(case, repeat=3, memory=True):
+    """
+    Returns benchmark results of the case: time to arrange the layout,
+    time to render it and peak memory of both steps.
+    """
+    result = case.as_dict()
+    try:
+        items = case.layout()
+    except LayoutError as e:
+        result["error"] = str(e)
+        return result
+
+    def draw():
+        render(items, case.width, case.height, BytesIO(), "bmp")
+
+    result["time"] = best_time(case.layout, repeat)
+    result["render_time"] = best_time(draw, repeat)
+    if memory:
+        result["peak_memory_kb"] = peak_memory(case.layout)
+        result["render_peak_memory_kb"] = peak_memory(draw)
+
+    return result
+
+
+def run(repeat=3, memory=True, match=None, progress=None, large=True):
+    """
+    Runs all benchmark cases with names containing match and returns
+    the report. The large-n tier is skipped unless large is true.
+    """
+    results = []
+    for case in cases(large):
+        if match and match not in case.name:
+            continue
+        result = run_case(case, repeat, memory)
+        if progress is not None:
+            progress(result)
+        results.append(result)
+
+    return {
+        "python": platform.python_version(),
+        "numpy": bool(numpy),
+        "results": results,
+    }
+
+
+# differences smaller than these are measurement noise
+METRICS = {
+    "time": 0.001,
+    "render_time": 0.001,
+    "peak_memory_kb": 256,
+    "render_peak_memory_kb": 256,
+}
+
+
+def compare(baseline, report, threshold=0.2):
+    """
+    Returns list of regressions of report against baseline report in
+    format [(name, metric, baseline value, new value), ...].
+
+    A metric regressed if it grew more than threshold (a fraction of
+    the baseline value) and more than the noise level in METRICS.
+    """
+    baseline_results = dict((result["name"], result) for result in baseline["results"])
+
+    regressions = []
+    for result in report["results"]:
+        base = baseline_results.get(result["name"])
+        if base is None:
+            continue
+
+        for metric, noise in METRICS.items():
+            if metric not in base or metric not in result:
+                continue
+            if result[metric] > base[metric] * (1 + threshold) and result[metric] - base[metric] > noise:
+                regressions.append((result["name"], metric, base[metric], result[metric]))
+
+    return regressions
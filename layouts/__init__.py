@@ -1,40 +1,164 @@
 from .primitives import Container, Circle
-from .layouts import HorizontalLineLayout, GridLayout, CircleLayout, RandomLayout
+from .layouts import HorizontalLineLayout, GridLayout, CircleLayout, RandomLayout, new_layout, optimal_radius
+from .cache import LayoutCache
+from .render import render
+from .stats import LayoutStats
+from .errors import LayoutError, LayoutTimeout
+from .deadline import Deadline, LayoutTask
 
 
-# radius is a global b/c we can't add extra parameters to layout functions
+# default radius of layout functions called without radius, kept for
+# callers that can't pass extra parameters. Not safe to change while
+# layouts are generated in other threads, pass radius instead.
 radius = None
 
+# results of deterministic layouts and seeded random layouts
+cache = LayoutCache(maxsize=128)
 
-def horizontal_line_layout(container_width, container_height, number_of_items):
-    container = Container(container_width, container_height)
-    layout = HorizontalLineLayout(container)
-    return arrange_items_in_layout(layout, number_of_items)
 
+def horizontal_line_layout(container_width, container_height, number_of_items,
+                           render_to=None, render_format=None, radius=None, deadline=None):
+    radius = item_radius(radius)
 
-def grid_layout(container_width, container_height, number_of_items):
-    container = Container(container_width, container_height)
-    layout = GridLayout(container)
-    return arrange_items_in_layout(layout, number_of_items)
+    def compute():
+        container = Container(container_width, container_height)
+        layout = HorizontalLineLayout(container, compact=True, deadline=deadline)
+        return arrange_items_in_layout(layout, number_of_items, radius)
 
+    key = ("horizontal_line", container_width, container_height, number_of_items, radius)
+    items = cache.get(key, compute)
+    render(items, container_width, container_height, render_to, render_format)
+    return items
 
-def circle_layout(container_width, container_height, number_of_items):
-    container = Container(container_width, container_height)
-    layout = CircleLayout(container)
-    return arrange_items_in_layout(layout, number_of_items)
 
+def grid_layout(container_width, container_height, number_of_items,
+                render_to=None, render_format=None, radius=None, deadline=None):
+    radius = item_radius(radius)
 
-def random_layout(container_width, container_height, number_of_items):
-    container = Container(container_width, container_height)
-    layout = RandomLayout(radius, container)
-    return arrange_items_in_layout(layout, number_of_items)
+    def compute():
+        container = Container(container_width, container_height)
+        layout = GridLayout(container, compact=True, deadline=deadline)
+        return arrange_items_in_layout(layout, number_of_items, radius)
 
+    key = ("grid", container_width, container_height, number_of_items, radius)
+    items = cache.get(key, compute)
+    render(items, container_width, container_height, render_to, render_format)
+    return items
 
-def arrange_items_in_layout(layout, number_of_items):
-    for x in range(0, number_of_items):
-        item = Circle(radius=radius)
-        layout.add(item)
 
-    layout.save()
+def circle_layout(container_width, container_height, number_of_items,
+                  render_to=None, render_format=None, radius=None, deadline=None):
+    radius = item_radius(radius)
+
+    def compute():
+        container = Container(container_width, container_height)
+        layout = CircleLayout(container, compact=True, deadline=deadline)
+        return arrange_items_in_layout(layout, number_of_items, radius)
+
+    key = ("circle", container_width, container_height, number_of_items, radius)
+    items = cache.get(key, compute)
+    render(items, container_width, container_height, render_to, render_format)
+    return items
+
+
+def random_layout(container_width, container_height, number_of_items, engine="pixels", seed=None,
+                  render_to=None, render_format=None, radius=None, rng=None, deadline=None):
+    """
+    Random positions are generated by rng, a random.Random instance, or
+    by a new one seeded with seed.
+
+    Pass a Deadline as deadline to limit time spent placing the items,
+    LayoutTimeout with the items placed until then is raised when it
+    expires.
+    """
+    radius = item_radius(radius)
+
+    def compute():
+        container = Container(container_width, container_height)
+        layout = RandomLayout(radius, container, engine=engine, seed=seed, rng=rng, compact=True,
+                              deadline=deadline)
+        return arrange_items_in_layout(layout, number_of_items, radius)
+
+    if seed is None or rng is not None:
+        # every call is expected to produce a different layout
+        items = compute()
+    else:
+        key = ("random", container_width, container_height, number_of_items, radius, engine, seed)
+        items = cache.get(key, compute)
+
+    render(items, container_width, container_height, render_to, render_format)
+    return items
+
+
+def iter_layout(kind, container_width, container_height, number_of_items, radius, stats=None):
+    """
+    Returns an iterator over items in format (x, y, r) arranged in the
+    layout of kind, one of "horizontal_line", "grid", "circle" or
+    "random".
+
+    Raise an error if the items can't be arranged before any item is
+    produced. Horizontal line and grid items are generated lazily, so
+    memory use doesn't grow with the number of items.
+
+    Pass a LayoutStats instance as stats to instrument the layout.
+    """
+    layout = new_layout(kind, Container(container_width, container_height), radius,
+                        compact=True, stats=stats)
+    return layout.iter_items(number_of_items, radius)
+
+
+LAYOUT_FUNCTIONS = {
+    "horizontal_line": horizontal_line_layout,
+    "grid": grid_layout,
+    "circle": circle_layout,
+    "random": random_layout,
+}
+
+
+def layout_many(jobs, workers=4):
+    """
+    Generates layouts of jobs in a pool of workers threads and returns
+    list of results in the order of jobs.
+
+    Jobs are in format [(kind, width, height, num_items, kwargs), ...],
+    where kwargs are passed to the layout function of kind, e.g.
+    {"radius": 5, "seed": 1}. Result of each job is list of items, or
+    LayoutError if the items couldn't be arranged.
+    """
+    def run(job):
+        kind, width, height, num_items, kwargs = job
+        try:
+            return LAYOUT_FUNCTIONS[kind](width, height, num_items, **kwargs)
+        except LayoutError as e:
+            return e
+
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(run, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def item_radius(value):
+    """
+    Returns value, or the global radius if value is None.
+    """
+    return radius if value is None else value
+
+
+def arrange_items_in_layout(layout, number_of_items, radius):
+    """
+    Adds number_of_items circles of radius to the layout and returns
+    the items in format [(x, y, r), ...]. Doesn't render anything.
+
+    Requests that can't succeed are rejected by the layout's
+    feasibility check before any items are placed.
+    """
+    with layout.phase("check"):
+        layout.check(number_of_items, radius)
+    layout.add_circles(number_of_items, radius)
 
     return layout.as_tuples()
@@ -0,0 +1,98 @@
+from itertools import izip
+from math import floor
+
+from .compat import numpy
+from .render import render
+
+
+def linear(t):
+    return t
+
+
+def ease_in(t):
+    return t * t
+
+
+def ease_out(t):
+    return t * (2 - t)
+
+
+def ease_in_out(t):
+    return t * t * (3 - 2 * t)
+
+
+EASINGS = {
+    "linear": linear,
+    "ease_in": ease_in,
+    "ease_out": ease_out,
+    "ease_in_out": ease_in_out,
+}
+
+
+def layout_columns(layout):
+    """
+    Returns coordinates of items of layout as columns (xs, ys, radii),
+    numpy arrays if numpy is installed, otherwise lists.
+    """
+    if layout.compact:
+        columns = (layout.items.xs, layout.items.ys, layout.items.radii)
+    else:
+        columns = zip(*layout.as_tuples()) or ((), (), ())
+
+    if not numpy:
+        return [list(column) for column in columns]
+    return [numpy.array(column, dtype=numpy.float_) for column in columns]
+
+
+def iter_frames(start, end, num_frames, easing="ease_in_out"):
+    """
+    Returns generator of num_frames frames of transition of items from
+    layout start to layout end, including both of them.
+
+    Each frame is a tuple of columns (xs, ys, radii) of integer numpy
+    arrays, or lists if numpy isn't installed. Item i of start moves to
+    item i of end, so both layouts must have the same number of items.
+
+    Easing is one of EASINGS or a function mapping time from 0 to 1 to
+    progress of the transition.
+    """
+    assert len(start.items) == len(end.items), "layouts must have the same number of items"
+    assert num_frames >= 2, "there must be at least 2 frames"
+
+    if not callable(easing):
+        assert easing in EASINGS, "easing must be one of %s" % ", ".join(sorted(EASINGS))
+        easing = EASINGS[easing]
+
+    times = [easing(i / float(num_frames - 1)) for i in range(0, num_frames)]
+    frames = numpy_frames if numpy else python_frames
+    return frames(layout_columns(start), layout_columns(end), times)
+
+
+def numpy_frames(start, end, times):
+    deltas = [b - a for a, b in izip(start, end)]
+    for t in times:
+        yield tuple(numpy.floor(a + delta * t + 0.5).astype(numpy.int_) for a, delta in izip(start, deltas))
+
+
+def python_frames(start, end, times):
+    for t in times:
+        yield tuple([int(floor(a + (b - a) * t + 0.5)) for a, b in izip(column_a, column_b)]
+                    for column_a, column_b in izip(start, end))
+
+
+def frame_items(frame):
+    """
+    Returns iterator over items of frame in format (x, y, r).
+    """
+    if numpy:
+        frame = [column.tolist() for column in frame]
+    return izip(*frame)
+
+
+def render_frames(frames, width, height, sink_pattern, format=None):
+    """
+    Renders every frame to sink_pattern % frame number, e.g.
+    "frame%03d.png". See render.render() for details.
+    """
+    for i, frame in enumerate(frames):
+        render(frame_items(frame), width, height, sink_pattern % i, format)
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LayoutCache(object):
+    """
+    Bounded in-memory cache of layout results with least recently used
+    eviction.
+
+    Keys are tuples of all parameters the layout depends on, values
+    are lists of item tuples as returned by BaseLayout.as_tuples().
+    """
+    def __init__(self, maxsize=128):
+        assert maxsize >= 0, "maxsize can't be negative"
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, compute):
+        """
+        Returns cached result for key. On a miss the result is
+        computed by calling compute() and stored in the cache.
+
+        Errors raised by compute() are not cached.
+        """
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                value = self._items.pop(key)
+                self._items[key] = value
+                return list(value)
+
+            self.misses += 1
+
+        value = compute()
+        self.put(key, value)
+
+        return list(value)
+
+    def put(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = list(value)
+            self._evict()
+
+    def resize(self, maxsize):
+        assert maxsize >= 0, "maxsize can't be negative"
+
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def invalidate(self, key=None):
+        """
+        Removes key from the cache or everything if key is not
+        specified.
+        """
+        with self._lock:
+            if key is None:
+                self._items.clear()
+            else:
+                self._items.pop(key, None)
+
+    def _evict(self):
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
@@ -0,0 +1,36 @@
+import importlib
+
+
+class OptionalModule(object):
+    """
+    Optional 3rd-party module imported on first use, so that importing
+    layouts stays fast.
+
+    It's false if the module isn't installed, attributes are looked up
+    in the imported module.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._missing = False
+
+    def _load(self):
+        if self._module is None and not self._missing:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError:
+                self._missing = True
+        return self._module
+
+    def __nonzero__(self):
+        return self._load() is not None
+
+    def __getattr__(self, name):
+        module = self._load()
+        if module is None:
+            raise AttributeError("%s is not installed" % self._name)
+        return getattr(module, name)
+
+
+# numpy is optional, pure Python implementations are used without it
+numpy = OptionalModule("numpy")
@@ -0,0 +1,87 @@
+import time
+import threading
+
+from .errors import LayoutTimeout
+
+
+class Deadline(object):
+    """
+    Time budget of a layout in seconds, no limit if timeout is None.
+
+    Layouts check it cooperatively in their placement loops, so they
+    stop soon after the budget runs out or the deadline is cancelled.
+    """
+    def __init__(self, timeout=None):
+        self.expires = None if timeout is None else time.time() + timeout
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def expired(self):
+        if self.cancelled.is_set():
+            return True
+        return self.expires is not None and time.time() >= self.expires
+
+    def remaining(self):
+        """
+        Returns seconds left until the deadline expires, None if there
+        is no limit.
+        """
+        if self.cancelled.is_set():
+            return 0.0
+        if self.expires is None:
+            return None
+        return max([self.expires - time.time(), 0.0])
+
+    def check(self, items=()):
+        """
+        Raise LayoutTimeout with the items placed so far if the
+        deadline expired.
+        """
+        if self.expired():
+            raise LayoutTimeout("layout cancelled" if self.cancelled.is_set() else "layout timed out", items)
+
+
+class LayoutTask(object):
+    """
+    Runs layout function, e.g. random_layout, with args in a background
+    thread. The function is passed a Deadline as deadline keyword
+    argument, cancel() stops the computation at its next check.
+    """
+    def __init__(self, function, *args, **kwargs):
+        self.deadline = Deadline(kwargs.pop("timeout", None))
+        kwargs["deadline"] = self.deadline
+
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(function, args, kwargs))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, function, args, kwargs):
+        try:
+            self._result = function(*args, **kwargs)
+        except Exception as e:
+            self._error = e
+
+    def cancel(self):
+        self.deadline.cancel()
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def result(self, timeout=None):
+        """
+        Waits for the layout and returns its result or raises its
+        error. Raise TimeoutError if it didn't finish within timeout
+        seconds, the layout keeps running until it's cancelled.
+        """
+        from multiprocessing import TimeoutError
+
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError("layout not finished")
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -1,2 +1,12 @@
 class LayoutError(Exception):
     pass
+
+
+class LayoutTimeout(LayoutError):
+    """
+    Layout ran out of its time budget or was cancelled. Items placed
+    until then are available in format [(x, y, r), ...] as items.
+    """
+    def __init__(self, message, items=()):
+        super(LayoutTimeout, self).__init__(message)
+        self.items = list(items)
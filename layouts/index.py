@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+
+class SpatialHash(object):
+    """
+    Uniform grid index of item bounding boxes.
+
+    Every item is stored in all grid cells its bounding box touches,
+    so only items sharing a cell have to be compared when looking for
+    overlaps.
+    """
+    def __init__(self, cell_size):
+        assert cell_size > 0, "cell size has to be greater than 0"
+
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+        # number of box pairs compared
+        self.comparisons = 0
+
+    @classmethod
+    def for_boxes(cls, boxes):
+        """
+        Returns an empty index with cell size derived from the largest
+        box side (2 * radius + 1 for circles), so a box spans at most 2
+        cells in each direction.
+        """
+        side = max([max(x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes] or [0])
+        return cls(side + 1)
+
+    def cell_range(self, box):
+        x0, y0, x1, y1 = box
+        size = self.cell_size
+        for cx in range(x0 // size, x1 // size + 1):
+            for cy in range(y0 // size, y1 // size + 1):
+                yield cx, cy
+
+    def insert(self, box):
+        """
+        Add box in format (x0, y0, x1, y1) to the index.
+        """
+        for cell in self.cell_range(box):
+            self.cells[cell].append(box)
+
+    def intersects(self, box):
+        """
+        Return True if box intersects with any box in the index,
+        otherwise False.
+        """
+        ax0, ay0, ax1, ay1 = box
+        cells = self.cells
+        for cell in self.cell_range(box):
+            candidates = cells.get(cell, ())
+            self.comparisons += len(candidates)
+            for bx0, by0, bx1, by1 in candidates:
+                if ax0 <= bx1 and ax1 >= bx0 and ay0 <= by1 and ay1 >= by0:
+                    return True
+
+        return False
+
+    def add(self, box):
+        """
+        Add box to the index unless it intersects with a box already
+        in the index.
+
+        Return True if the box was added, otherwise False.
+        """
+        if self.intersects(box):
+            return False
+
+        self.insert(box)
+        return True
@@ -1,18 +1,59 @@
 import random
 
-from itertools import combinations
-from math import pi, sin, cos, ceil
+from itertools import izip
+from math import pi, sin, cos, asin, ceil, sqrt
 
-from PIL import Image, ImageDraw
-
-from .primitives import Item
+from .primitives import Item, Circle, Container
 from .errors import LayoutError
+from .index import SpatialHash
+from .sampling import poisson_disk_sample, dart_throw_sample, OccupancyMask
+from .parallel import parallel_sample
+from .compat import numpy
+from .render import render
+from .output import iter_write, write_columns
+from .storage import ItemArray
+from .stats import NO_PHASE
+
 
+# numpy is imported only for layouts of at least this many items, for
+# fewer items importing it takes longer than vectorizing saves
+VECTORIZE_MIN_ITEMS = 1000
 
 class BaseLayout(object):
-    def __init__(self, container):
+    def __init__(self, container, compact=False, stats=None, deadline=None):
+        """
+        Items are stored as list of Circle objects, or in an ItemArray
+        if compact is True.
+
+        Pass a LayoutStats instance as stats to record time spent in
+        each phase and counters of the work done.
+
+        Pass a Deadline as deadline to limit time spent arranging the
+        items, LayoutTimeout is raised when it expires.
+        """
         self.container = container
-        self.items = []
+        self.compact = compact
+        self.items = ItemArray() if compact else []
+        self.stats = stats
+        self.deadline = deadline
+
+    def phase(self, name):
+        """
+        Returns context manager measuring the time of phase, it does
+        nothing if stats are disabled.
+        """
+        if self.stats is None:
+            return NO_PHASE
+        return self.stats.phase(name)
+
+    def timed(self, items, name):
+        """
+        Returns iterator over lazily generated items, time spent
+        generating them is recorded as phase name if stats are enabled.
+        """
+        if self.stats is None:
+            return items
+        return self.stats.iterate(name, items)
 
     def add(self, item):
         """
@@ -22,22 +63,97 @@ class BaseLayout(object):
         to place all items within the contianer or items are
         overlapping.
         """
-        # make sure there's enough space to fit all items
-        if self.container.capacity(Item.MIN_SIDE_SIZE) < len(self.items) + 1:
+        self.add_many([item])
+
+    def add_many(self, items):
+        """
+        Add multiple items to the layout and re-arrange the layout
+        once for the final number of items.
+
+        Raise an error if container is too small or it's not possible
+        to place all items within the contianer or items are
+        overlapping.
+        """
+        if not items:
+            return
+
+        self.check_capacity(len(items))
+        self.items.extend(items)
+        self.rearrange(len(items))
+
+    def add_circles(self, num_items, radius):
+        """
+        Same as add_many() for num_items new circles of radius. Compact
+        layouts store them straight in the arrays, without creating a
+        Circle object per item.
+        """
+        if not num_items:
+            return
+
+        self.check_capacity(num_items)
+        if self.compact:
+            self.items.extend_circles(num_items, radius)
+        else:
+            self.items.extend([Circle(radius=radius) for x in xrange(0, num_items)])
+        self.rearrange(num_items)
+
+    def check_capacity(self, num_new_items):
+        """
+        Raise an error if the container is too small to fit
+        num_new_items more items.
+        """
+        if self.container.capacity(Item.MIN_SIDE_SIZE) < len(self.items) + num_new_items:
             raise LayoutError("container too small to fit all items")
 
-        self.items.append(item)
-        coords = self.item_coordinates(len(self.items))
+    def rearrange(self, num_new_items):
+        """
+        Arranges all items of the layout after num_new_items have been
+        added.
+        """
+        num_items = len(self.items)
+        if self.stats is not None:
+            self.stats.count("layouts")
+            self.stats.count("items", num_new_items)
+
+        with self.phase("item_coordinates"):
+            vectorize = num_items >= VECTORIZE_MIN_ITEMS and numpy
+            arrays = self.item_coordinate_arrays(num_items) if vectorize else None
+            if arrays is None:
+                coords = self.item_coordinates(num_items)
 
-        self.arrange(coords)
+        with self.phase("arrange"):
+            if arrays is not None:
+                self.arrange_arrays(*arrays)
+            else:
+                self.arrange(coords)
 
-        if self.items_intersect():
-            raise LayoutError("overlapping items")
+        if self.deadline is not None and self.deadline.expired():
+            # arranged items are the best partial layout unless they
+            # overlap
+            valid = self.spacing_certified() or not self.items_intersect()
+            self.deadline.check(self.as_tuples() if valid else [])
+
+        with self.phase("items_intersect"):
+            if self.spacing_certified():
+                if self.stats is not None:
+                    self.stats.count("certified")
+            elif self.items_intersect():
+                raise LayoutError("overlapping items")
 
     def arrange(self, coords):
         """
         Arrange items in layout or raise error if it's not possible.
         """
+        if len(coords) < len(self.items):
+            raise LayoutError("couldn't place all items in the container")
+
+        if self.compact:
+            self.items.set_coordinates(coords)
+            for box in self.items.box_coordinates():
+                if not self.container.box_within_bounds(box):
+                    raise LayoutError("item doesn't fit in the container")
+            return
+
         for i, item in enumerate(self.items):
             px, py = coords[i]
 
@@ -48,30 +164,189 @@ class BaseLayout(object):
             if not self.container.within_bounds(item):
                 raise LayoutError("item doesn't fit in the container")
 
+    def arrange_arrays(self, xs, ys):
+        """
+        Same as arrange() for coordinates in numpy arrays, bounds of all
+        items are checked at once.
+        """
+        num_items = len(self.items)
+        if len(xs) < num_items:
+            raise LayoutError("couldn't place all items in the container")
+
+        xs = xs[:num_items]
+        ys = ys[:num_items]
+        if self.compact:
+            radii = numpy.frombuffer(self.items.radii, dtype=numpy.intc)
+        else:
+            radii = numpy.fromiter((item.radius for item in self.items), numpy.intc, num_items)
+
+        if not self.container.within_bounds_all(xs, ys, radii):
+            raise LayoutError("item doesn't fit in the container")
+
+        if self.compact:
+            self.items.set_coordinate_arrays(xs, ys)
+        else:
+            for item, px, py in izip(self.items, xs.tolist(), ys.tolist()):
+                item.x = px
+                item.y = py
+
+    def item_coordinate_arrays(self, num_items):
+        """
+        Returns numpy arrays (xs, ys) of coordinates where items can be
+        placed, same as item_coordinates().
+
+        Layouts without a vectorized implementation return None.
+        """
+        return None
+
+    def spacing_certified(self):
+        """
+        Returns True if spacing of the arranged items guarantees they
+        don't overlap, so items_intersect() doesn't have to be checked.
+
+        Layouts that know their spacing override this.
+        """
+        return False
+
+    def largest_item_radius(self):
+        """
+        Returns the largest radius of items in the layout, None if
+        there are no items.
+        """
+        if not len(self.items):
+            return None
+        if self.compact:
+            return max(self.items.radii)
+        return max(item.radius for item in self.items)
+
     def items_intersect(self):
         """
         Return True if any of the items intersect, otherwise False.
+
+        Items are inserted one by one into a spatial hash, so each item
+        is only compared with the items in neighbouring grid cells.
         """
-        for a, b in combinations(self.items, 2):
-            if a.intersects_with(b):
-                return True
+        if self.compact:
+            boxes = list(self.items.box_coordinates())
+        else:
+            boxes = [item.box_coordinates() for item in self.items]
+        index = SpatialHash.for_boxes(boxes)
+        try:
+            for box in boxes:
+                if not index.add(box):
+                    return True
 
-        return False
+            return False
+        finally:
+            if self.stats is not None:
+                self.stats.count("pair_checks", index.comparisons)
 
-    def save(self):
+    def save(self, sink="plot.bmp", format=None, tiled=False):
         """
-        Creates bitmap image of the layout and saves as a plot.bmp.
+        Creates image of the layout and writes it to sink, a file path
+        or a file-like object. See render.render() for details.
         """
-        img = Image.new("1", (self.container.width, self.container.height))
-        draw = ImageDraw.Draw(img)
-        for item in self.items:
-            draw.ellipse(item.box_coordinates(), fill=1)
-        del draw
-        img.save("plot.bmp", "bmp")
+        with self.phase("render"):
+            render(self.as_tuples(), self.container.width, self.container.height, sink, format, tiled)
+
+    def write(self, f, format="repr"):
+        """
+        Writes coordinates of the items to file f in format, one of
+        output.FORMATS. Compact layouts write binary formats straight
+        from the coordinate arrays.
+        """
+        if self.compact:
+            write_columns(self.items, f, format)
+            return
+
+        items = (item.as_tuple() for item in self.items)
+        for item in iter_write(items, f, format, len(self.items)):
+            pass
 
     def as_tuples(self):
+        if self.compact:
+            return self.items.as_tuples()
         return [x.as_tuple() for x in self.items]
 
+    def iter_items(self, num_items, radius):
+        """
+        Validate layout of num_items circles of radius and return an
+        iterator over the items in format (x, y, r).
+
+        Raise an error if the items can't be arranged, before the
+        iterator is returned. Layouts that can't validate the result in
+        advance add all items first and then convert them to tuples one
+        by one.
+        """
+        with self.phase("check"):
+            self.check(num_items, radius)
+        self.add_circles(num_items, radius)
+        if self.compact:
+            return izip(self.items.xs, self.items.ys, self.items.radii)
+        return (item.as_tuple() for item in self.items)
+
+    def check(self, num_items, radius):
+        """
+        Raise an error if num_items circles of radius can't be arranged
+        in the layout, without placing any items.
+
+        Layouts override this with checks specific to the layout; the
+        base implementation only checks capacity of the container, so
+        passing the check doesn't guarantee the items can be arranged.
+        """
+        if self.container.capacity(Item.MIN_SIDE_SIZE) < num_items:
+            raise LayoutError("container too small to fit all items")
+
+    def feasible(self, num_items, radius):
+        """
+        Return False if num_items circles of radius can't be arranged
+        in the layout, otherwise True.
+        """
+        try:
+            self.check(num_items, radius)
+        except LayoutError:
+            return False
+        return True
+
+    def max_items(self, radius):
+        """
+        Returns the largest number of circles of radius that pass the
+        feasibility check.
+
+        Rounding of coordinates makes feasibility not monotonic in
+        number of items, so item counts are checked one by one down
+        from max_items_bound().
+        """
+        for num_items in xrange(self.max_items_bound(radius), 0, -1):
+            if self.feasible(num_items, radius):
+                return num_items
+        return 0
+
+    def max_items_bound(self, radius):
+        """
+        Returns number of items no layout of circles of radius can
+        exceed. Layouts override this with tighter bounds.
+        """
+        return self.container.capacity(Item.MIN_SIDE_SIZE)
+
+    def max_radius(self, num_items):
+        """
+        Returns the largest radius of num_items circles that can be
+        arranged in the layout, or 0 if they don't fit at all.
+
+        Found by bisection of the feasibility check, layouts with item
+        positions independent of radius override this with a closed
+        form.
+        """
+        low, high = 0, min([self.container.width, self.container.height]) / 2
+        while low < high:
+            middle = (low + high + 1) / 2
+            if self.feasible(num_items, middle):
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
 
 class HorizontalLineLayout(BaseLayout):
     """
@@ -106,40 +381,249 @@ class HorizontalLineLayout(BaseLayout):
 
         return coords
 
+    def item_coordinate_arrays(self, num_items):
+        part_width = self.container.width / num_items
+        xs = (numpy.arange(num_items) * part_width) + (part_width / 2)
+
+        # there has to be at least 1px margin to the left and right of the point
+        xs = xs[(xs + 1 < self.container.width) & (xs - 1 >= 0)]
+        if len(xs) < num_items:
+            raise LayoutError("couldn't place all items in the container")
+
+        return xs, numpy.repeat(self.baseline, num_items)
+
+    def iter_items(self, num_items, radius):
+        """
+        Validate layout of num_items circles of radius and return an
+        iterator over the items in format (x, y, r).
+
+        Items are generated lazily.
+        """
+        if num_items == 0:
+            return iter([])
+
+        if self.stats is not None:
+            self.stats.count("layouts")
+            self.stats.count("items", num_items)
+
+        with self.phase("check"):
+            self.check(num_items, radius)
+
+        part_width = self.container.width / num_items
+        first = part_width / 2
+        items = ((i * part_width + first, self.baseline, radius) for i in xrange(0, num_items))
+        return self.timed(items, "item_coordinates")
+
+    def check(self, num_items, radius):
+        """
+        Raise an error if num_items circles of radius can't be arranged
+        in the layout.
+
+        Items are spaced evenly, so it's enough to check the first and
+        the last item and the spacing.
+        """
+        super(HorizontalLineLayout, self).check(num_items, radius)
+        if num_items == 0:
+            return
+
+        part_width = self.container.width / num_items
+        first = part_width / 2
+        last = ((num_items - 1) * part_width) + (part_width / 2)
+        y = self.baseline
+
+        if first - 1 < 0 or last + 1 >= self.container.width:
+            raise LayoutError("couldn't place all items in the container")
+
+        if first - radius < 0 or last + radius >= self.container.width or \
+           y - radius < 0 or y + radius >= self.container.height:
+            raise LayoutError("item doesn't fit in the container")
+
+        if num_items > 1 and part_width <= radius * 2:
+            raise LayoutError("overlapping items")
+
+    def spacing_certified(self):
+        # items are part_width apart
+        num_items = len(self.items)
+        return num_items <= 1 or self.container.width / num_items > self.largest_item_radius() * 2
+
+    def max_items_bound(self, radius):
+        # items have to be more than 2 * radius apart
+        bound = max([1, self.container.width / (radius * 2 + 1)])
+        return min([bound, super(HorizontalLineLayout, self).max_items_bound(radius)])
+
+    def max_radius(self, num_items):
+        if not self.feasible(num_items, 1):
+            return 0
+
+        # distance of the first and the last item and the baseline to
+        # the container edges, and half of the spacing
+        part_width = self.container.width / num_items
+        first = part_width / 2
+        last = ((num_items - 1) * part_width) + first
+        y = self.baseline
+        limits = [first, self.container.width - 1 - last, y, self.container.height - 1 - y]
+        if num_items > 1:
+            limits.append((part_width - 1) / 2)
+        return min(limits)
+
 
 class GridLayout(BaseLayout):
     """
     All items are organized in a grid, all aligned vertically and horizontally.
     """
-    def item_coordinates(self, num_items):
+    def grid_size(self, num_items):
+        """
+        Returns (num_lines, column_width, column_height) of the grid
+        that fits num_items: number of vertical and horizontal grid
+        lines and the spacing between them.
+
+        Grid always has same number of vertical and horizontal lines,
+        just enough to fit all items. The container is split into equal
+        cells, one per grid line in each direction, and the lines go
+        through the middle of the cells. Raise an error if there's not
+        enough space for all grid lines in the container.
+        """
+        num_lines = int(ceil(sqrt(num_items)))
+        column_width = self.container.width / num_lines
+        column_height = self.container.height / num_lines
+        num_columns, num_rows = self.grid_shape(num_items, num_lines)
+
+        # there has to be at least 1px margin around every intersection point
+        if column_width < 1 or column_height < 1 or \
+           self.container.width - (num_columns - 1) * column_width < 3 or \
+           self.container.height - (num_rows - 1) * column_height < 3:
+            raise LayoutError("couldn't place all items in the container")
+
+        return num_lines, column_width, column_height
+
+    def grid_shape(self, num_items, num_lines):
         """
-        Returns list of coordinates where grid lines intersect in
-        format [(x, y), ...]
+        Returns (num_columns, num_rows) of the grid lines used by
+        num_items, which fill the grid column by column.
+        """
+        return int(ceil(num_items / float(num_lines))), min([num_items, num_lines])
 
-        Grid always has same number of vertical and horizontal
-        columns.
+    def grid_origin(self, num_items, num_lines, column_width, column_height):
+        """
+        Returns coordinates of the first grid intersection point, such
+        that the columns and rows used by num_items are centered in the
+        container.
+        """
+        num_columns, num_rows = self.grid_shape(num_items, num_lines)
+        return (self.container.width - (num_columns - 1) * column_width) / 2, \
+            (self.container.height - (num_rows - 1) * column_height) / 2
+
+    def item_coordinates(self, num_items):
+        """
+        Returns list of num_items coordinates where grid lines
+        intersect in format [(x, y), ...], column by column.
 
         There has to be at least 2px margin between grid lines.
         """
-        num_columns = min([num_items + 1, Item.MIN_SIDE_SIZE])
-        column_width = self.container.width / num_columns
-        column_height = self.container.height / num_columns
+        return list(self.iter_coordinates(num_items))
+
+    def iter_coordinates(self, num_items):
+        num_lines, column_width, column_height = self.grid_size(num_items)
+        x0, y0 = self.grid_origin(num_items, num_lines, column_width, column_height)
+        for i in xrange(0, num_items):
+            x, y = divmod(i, num_lines)
+            yield x0 + x * column_width, y0 + y * column_height
+
+    def item_coordinate_arrays(self, num_items):
+        num_lines, column_width, column_height = self.grid_size(num_items)
+        x0, y0 = self.grid_origin(num_items, num_lines, column_width, column_height)
+
+        x, y = numpy.divmod(numpy.arange(num_items), num_lines)
+        return x0 + x * column_width, y0 + y * column_height
+
+    def iter_items(self, num_items, radius):
+        """
+        Validate layout of num_items circles of radius and return an
+        iterator over the items in format (x, y, r).
+
+        Items are generated lazily.
+        """
+        if num_items == 0:
+            return iter([])
+
+        if self.stats is not None:
+            self.stats.count("layouts")
+            self.stats.count("items", num_items)
+
+        with self.phase("check"):
+            self.check(num_items, radius)
+
+        items = ((x, y, radius) for x, y in self.iter_coordinates(num_items))
+        return self.timed(items, "item_coordinates")
+
+    def check(self, num_items, radius):
+        """
+        Raise an error if num_items circles of radius can't be arranged
+        in the layout.
 
-        points = []
-        for x in range(0, num_items):
-            for y in range(0, num_items):
-                px = (x * (column_width + 1)) + column_width
-                py = (y * (column_height + 1)) + column_height
+        Items are spaced evenly, so it's enough to check the outermost
+        items and the spacing.
+        """
+        super(GridLayout, self).check(num_items, radius)
+        if num_items == 0:
+            return
+
+        num_lines, column_width, column_height = self.grid_size(num_items)
+        num_columns, num_rows = self.grid_shape(num_items, num_lines)
+
+        x0, y0 = self.grid_origin(num_items, num_lines, column_width, column_height)
+        last_x = x0 + (num_columns - 1) * column_width
+        last_y = y0 + (num_rows - 1) * column_height
+        if x0 - radius < 0 or y0 - radius < 0 or \
+           last_x + radius >= self.container.width or last_y + radius >= self.container.height:
+            raise LayoutError("item doesn't fit in the container")
+
+        if (num_columns > 1 and column_width <= radius * 2) or \
+           (num_rows > 1 and column_height <= radius * 2):
+            raise LayoutError("overlapping items")
 
-                # there has to be at least 1px margin around the intersection point
-                if px + 1 >= self.container.width or py + 1 >= self.container.height or \
-                   px - 1 < 0 or py - 1 < 0:
-                    # item would go out bounds of the container, skip this point...
-                    continue
+    def spacing_certified(self):
+        # items are column_width apart in x and column_height apart in
+        # y direction
+        num_items = len(self.items)
+        num_lines, column_width, column_height = self.grid_size(num_items)
+        radius = self.largest_item_radius()
+        return (num_items <= num_lines or column_width > radius * 2) and \
+               (num_lines == 1 or column_height > radius * 2)
+
+    def max_items(self, radius):
+        """
+        Returns the largest number of circles of radius that can be
+        arranged in the grid.
+
+        Full grid of num_lines fits if its cells are at least 2 *
+        radius + 1 wide and high. A grid with more lines can only fit
+        if it has a single column.
+        """
+        num_lines = min([self.container.width, self.container.height]) / (radius * 2 + 1)
+        num_items = num_lines * num_lines
+        while self.feasible(num_items + 1, radius):
+            num_items += 1
+        return num_items
 
-                points.append((px, py))
+    def max_radius(self, num_items):
+        if not self.feasible(num_items, 1):
+            return 0
 
-        return points
+        num_lines, column_width, column_height = self.grid_size(num_items)
+        num_columns, num_rows = self.grid_shape(num_items, num_lines)
+
+        # distance of the outermost items to the container edges, and
+        # half of the spacing
+        x0, y0 = self.grid_origin(num_items, num_lines, column_width, column_height)
+        last_x = x0 + (num_columns - 1) * column_width
+        last_y = y0 + (num_rows - 1) * column_height
+        limits = [x0, y0, self.container.width - 1 - last_x, self.container.height - 1 - last_y]
+        if num_columns > 1:
+            limits.append((column_width - 1) / 2)
+        if num_rows > 1:
+            limits.append((column_height - 1) / 2)
+        return min(limits)
 
 
 class CircleLayout(BaseLayout):
@@ -164,75 +648,541 @@ class CircleLayout(BaseLayout):
         """
         return self.container.width / 2, self.container.height / 2
 
-    def item_coordinates(self, num_items):
+    def item_coordinates(self, num_items, radius=None):
         """
-        Returns list of coordinates where items can be placed.
+        Returns list of coordinates where items of radius can be
+        placed, by default the largest radius of items in the layout.
+
+        Items are placed on a single ring of circle_radius if they fit
+        there, otherwise on concentric rings around it. Returns fewer
+        coordinates if there are not enough rings.
         """
+        if radius is None:
+            radius = self.largest_item_radius()
+
+        coords = self.ring_coordinates(self.circle_radius, num_items)
+        if radius is None or self.ring_certified(self.circle_radius, num_items, radius) or \
+           self.coordinates_fit(coords, radius):
+            return coords
+
+        return self.rings_coordinates(num_items, radius)
+
+    def item_coordinate_arrays(self, num_items):
+        radius = self.largest_item_radius()
+        if radius is not None and not self.ring_certified(self.circle_radius, num_items, radius):
+            xs, ys = zip(*self.item_coordinates(num_items, radius)) or ((), ())
+            return numpy.array(xs, dtype=numpy.int_), numpy.array(ys, dtype=numpy.int_)
+
         cx, cy = self.circle_center
 
-        angle = 2 * pi / num_items
+        angles = (2 * pi / num_items) * numpy.arange(1, num_items + 1)
+        xs = numpy.ceil(cx + (self.circle_radius * numpy.cos(angles)))
+        ys = numpy.ceil(cy + (self.circle_radius * numpy.sin(angles)))
+
+        return xs.astype(numpy.int_), ys.astype(numpy.int_)
+
+    def ring_coordinates(self, ring_radius, num_items):
+        """
+        Returns list of coordinates of num_items placed regularly on a
+        ring of ring_radius around the circle center.
+        """
+        cx, cy = self.circle_center
+
+        angle = 2 * pi / num_items if num_items else 0
 
         coords = []
         for i in range(1, num_items + 1):
-            x = cx + (self.circle_radius * cos(angle * i))
-            y = cy + (self.circle_radius * sin(angle * i))
+            x = cx + (ring_radius * cos(angle * i))
+            y = cy + (ring_radius * sin(angle * i))
 
             coords.append((int(ceil(x)), int(ceil(y))))
 
         return coords
 
+    def ring_spacing(self, radius):
+        """
+        Returns the smallest distance of item centers before rounding
+        that guarantees items of radius don't overlap after rounding.
+
+        Rounding moves centers less than 1px in each direction, and
+        boxes don't intersect if centers are 2 * radius + 1 apart in x
+        or y direction, which is true for points sqrt(2) times that far.
+        """
+        return sqrt(2) * (radius * 2 + 1)
+
+    def ring_limit(self, radius):
+        """
+        Returns the largest radius of a ring whose items of radius are
+        within container bounds.
+        """
+        cx, cy = self.circle_center
+        return min([cx, cy, self.container.width - 1 - cx, self.container.height - 1 - cy]) - radius - 1
+
+    def ring_capacity(self, ring_radius, radius):
+        """
+        Returns number of items of radius that certainly fit on a ring
+        of ring_radius: neighbours are at least ring_spacing() apart.
+        """
+        if ring_radius > self.ring_limit(radius):
+            return 0
+
+        spacing = self.ring_spacing(radius)
+        if ring_radius <= 0 or spacing > ring_radius * 2:
+            return 1
+
+        capacity = int(pi / asin(spacing / (ring_radius * 2)))
+        while capacity > 1 and ring_radius * 2 * sin(pi / capacity) < spacing:
+            capacity -= 1
+        return capacity
+
+    def ring_certified(self, ring_radius, num_items, radius):
+        return num_items <= self.ring_capacity(ring_radius, radius)
+
+    def rings(self, radius):
+        """
+        Returns list of radii of rings for items of radius, the
+        circle_radius ring first, then rings outwards and inwards.
+        """
+        spacing = int(ceil(self.ring_spacing(radius)))
+        outward = range(self.circle_radius, self.ring_limit(radius) + 1, spacing)
+        inward = range(self.circle_radius - spacing, 0, -spacing)
+        return [ring for ring in outward + inward if ring <= self.ring_limit(radius)]
+
+    def rings_capacity(self, radius):
+        """
+        Returns number of items of radius that certainly fit on all
+        rings together.
+        """
+        return sum(self.ring_capacity(ring, radius) for ring in self.rings(radius))
+
+    def rings_coordinates(self, num_items, radius):
+        coords = []
+        for ring in self.rings(radius):
+            if len(coords) == num_items:
+                break
+            capacity = self.ring_capacity(ring, radius)
+            coords.extend(self.ring_coordinates(ring, min([capacity, num_items - len(coords)])))
+        return coords
+
+    def coordinates_fit(self, coords, radius):
+        """
+        Returns True if items of radius at coords are within container
+        bounds and don't overlap.
+        """
+        boxes = [(x - radius, y - radius, x + radius, y + radius) for x, y in coords]
+        if not all(self.container.box_within_bounds(box) for box in boxes):
+            return False
+
+        index = SpatialHash(radius * 2 + 1)
+        return all(index.add(box) for box in boxes)
+
+    def spacing_certified(self):
+        # item_coordinates() only returns coordinates of items that
+        # don't overlap
+        return True
+
+    def check(self, num_items, radius):
+        """
+        Raise an error if num_items circles of radius can't be arranged
+        in the layout, without creating any items.
+
+        Coordinates are only generated if num_items is between capacity
+        of the rings, which always fit, and max_items_bound(), where
+        rounding of coordinates decides.
+        """
+        super(CircleLayout, self).check(num_items, radius)
+
+        rings_capacity = self.rings_capacity(radius)
+        if num_items <= rings_capacity:
+            return
+        if num_items > self.max_items_bound(radius):
+            raise LayoutError("couldn't place all items in the container")
+
+        coords = self.item_coordinates(num_items, radius)
+        if len(coords) < num_items:
+            raise LayoutError("couldn't place all items in the container")
+
+        boxes = [(x - radius, y - radius, x + radius, y + radius) for x, y in coords]
+        if not all(self.container.box_within_bounds(box) for box in boxes):
+            raise LayoutError("item doesn't fit in the container")
+
+        index = SpatialHash(radius * 2 + 1)
+        if not all(index.add(box) for box in boxes):
+            raise LayoutError("overlapping items")
+
+    def max_items(self, radius):
+        # any number of items up to capacity of all rings fits
+        rings_capacity = self.rings_capacity(radius)
+        for num_items in xrange(self.max_items_bound(radius), rings_capacity, -1):
+            if self.feasible(num_items, radius):
+                return num_items
+        return rings_capacity
+
+    def max_items_bound(self, radius):
+        # neighbours on the circle are less than 2 * pi * R / n apart
+        # and rounding moves them at most 1px closer
+        bound = int(2 * pi * self.circle_radius / max([1, radius * 2 - 1])) + 1
+        return min([bound, super(CircleLayout, self).max_items_bound(radius)])
+
+    def max_radius(self, num_items):
+        single = 0
+        if self.feasible(num_items, 1) and self.coordinates_fit(self.ring_coordinates(self.circle_radius, num_items), 1):
+            single = self.ring_max_radius(num_items)
+
+        # rings hold fewer items of larger radius
+        low, high = 0, min([self.container.width, self.container.height]) / 2
+        while low < high:
+            middle = (low + high + 1) / 2
+            if self.rings_capacity(middle) >= num_items:
+                low = middle
+            else:
+                high = middle - 1
+
+        return max([single, low])
+
+    def ring_max_radius(self, num_items):
+        """
+        Returns the largest radius of num_items items on the single
+        ring of circle_radius.
+        """
+        # distance of items to the container edges, and half of the
+        # distance to the neighbours on the circle
+        coords = self.ring_coordinates(self.circle_radius, num_items)
+        limits = [min([x, y, self.container.width - 1 - x, self.container.height - 1 - y])
+                  for x, y in coords]
+        if num_items > 1:
+            for (ax, ay), (bx, by) in zip(coords, coords[1:] + coords[:1]):
+                limits.append((max([abs(ax - bx), abs(ay - by)]) - 1) / 2)
+        radius = min(limits)
+
+        # after rounding, items that are not neighbours can be closer
+        while radius > 1 and not self.coordinates_fit(coords, radius):
+            radius -= 1
+        return radius
+
 
 class RandomLayout(BaseLayout):
     """
     It looks like the items have been placed on the screen randomly.
 
     All items have the same size.
+
+    Item positions are generated by one of the ENGINES:
+
+    * pixels - picks item centers one by one from the set of all
+      available pixel positions in the container
+    * poisson - random points thrown against already placed items
+      while the layout is sparse, Poisson-disk sampling of the whole
+      container for dense layouts, time and memory grow with number of
+      items instead of number of pixels
+    * bitmap - same as pixels, but available positions are tracked in
+      a numpy bitmap, falls back to pixels when numpy isn't installed
+    * parallel - same as poisson, but the container is split into
+      strips sampled in workers processes (all CPUs by default), the
+      result doesn't depend on number of workers
+
+    By default every add() places all items again. If incremental is
+    True, available positions are kept between add() calls and new
+    items are placed in the space left by the items already in the
+    layout, which don't move.
+
+    Random positions are generated by rng, a random.Random instance, or
+    by a new one seeded with seed.
     """
+    ENGINES = ("pixels", "poisson", "bitmap", "parallel")
+
+    # engines selecting items from a sample of the whole container
+    SAMPLE_ENGINES = ("poisson", "parallel")
+
+    # sample engines throw items at random positions instead of sampling
+    # the whole container while the number of items is at most
+    # max_items() / SPARSE_FACTOR
+    SPARSE_FACTOR = 8
+
     def __init__(self, radius, *args, **kwargs):
+        engine = kwargs.pop("engine", "pixels")
+        seed = kwargs.pop("seed", None)
+        rng = kwargs.pop("rng", None)
+        incremental = kwargs.pop("incremental", False)
+        workers = kwargs.pop("workers", None)
+        assert engine in self.ENGINES, "engine must be one of %s" % ", ".join(self.ENGINES)
+
         super(RandomLayout, self).__init__(*args, **kwargs)
 
+        if engine == "bitmap" and not numpy:
+            engine = "pixels"
+
         self.radius = radius
+        self.engine = engine
+        self.workers = workers
+        self.incremental = incremental
 
-        # seed random number generator with current system time
-        random.seed()
+        # available center positions of incremental layout, built on
+        # first add()
+        self.free = None
 
-    def add(self, item):
+        # every layout has its own random number generator, seeded with
+        # current system time unless a seed is given to reproduce a
+        # layout
+        self.rng = rng if rng is not None else random.Random(seed)
+
+    def add_many(self, items):
         """
-        Add a new item to the layout and re-arrange the layout.
+        Add multiple items to the layout and re-arrange the layout.
 
         Raise an error if container is too small or it's not possible
         to place all items within the contianer.
         """
-        assert item.radius == self.radius, "item radius must be %d" % self.radius
+        for item in items:
+            assert item.radius == self.radius, "item radius must be %d" % self.radius
+
+        if self.incremental:
+            self.place_many(items)
+        else:
+            super(RandomLayout, self).add_many(items)
+
+    def add_circles(self, num_items, radius):
+        assert radius == self.radius, "item radius must be %d" % self.radius
+
+        if self.incremental:
+            self.place_many([Circle(radius=radius) for x in xrange(0, num_items)])
+        else:
+            super(RandomLayout, self).add_circles(num_items, radius)
+
+    def place_many(self, items):
+        """
+        Place items in the free space of incremental layout without
+        moving the items already in the layout.
 
-        super(RandomLayout, self).add(item)
+        Raise an error if container is too small or there's no space
+        left for all items, in that case none of the items are added.
+        """
+        if not items:
+            return
+
+        num_items = len(self.items) + len(items)
+        if self.container.capacity(Item.MIN_SIDE_SIZE) < num_items:
+            raise LayoutError("container too small to fit all items")
+        if num_items > self.max_items(self.radius):
+            raise LayoutError("couldn't place all items in the container")
+
+        if self.stats is not None:
+            self.stats.count("layouts")
+            self.stats.count("items", len(items))
+
+        if self.free is None:
+            with self.phase("candidates"):
+                self.free = self.free_centers()
+
+        coords = []
+        with self.phase("item_coordinates"):
+            for item in items:
+                if self.deadline is not None and self.deadline.expired():
+                    self.free = None
+                    self.deadline.check(self.placed_items(coords))
+                if not self.free:
+                    # zones of the coords taken so far are already
+                    # excluded, rebuild free positions on next add()
+                    self.free = None
+                    raise LayoutError("couldn't place all items in the container")
+                coords.append(self.take_center(self.free))
+
+        for item, (x, y) in zip(items, coords):
+            item.x = x
+            item.y = y
+        self.items.extend(items)
+
+    def free_centers(self):
+        """
+        Returns available center positions of the engine, without the
+        positions taken by the items already in the layout.
+        """
+        points = [(item.x, item.y) for item in self.items]
+        r = self.radius
+
+        if self.engine in self.SAMPLE_ENGINES:
+            index = SpatialHash(r * 2 + 1)
+            for x, y in points:
+                index.insert((x - r, y - r, x + r, y + r))
+
+            sample = self.sample_centers()
+            free = [(x, y) for x, y in sample if not index.intersects((x - r, y - r, x + r, y + r))]
+            self.rng.shuffle(free)
+        elif self.engine == "bitmap":
+            free = OccupancyMask(self.container.width, self.container.height, self.radius)
+            for point in points:
+                free.exclude(point)
+        else:
+            free = self.center_coords(self.deadline)
+            for point in points:
+                self.center_coords_cleanup(free, point)
+
+        if self.stats is not None:
+            self.stats.count("candidates", len(free))
+
+        return free
+
+    def take_center(self, free):
+        """
+        Removes random position from free positions returned by
+        free_centers() together with its exclusion zone and returns it.
+        """
+        if self.engine in self.SAMPLE_ENGINES:
+            # already shuffled and far enough from each other
+            return free.pop()
+
+        if self.engine == "bitmap":
+            point = free.choice(self.rng)
+            with self.phase("candidate_cleanup"):
+                free.exclude(point)
+            return point
+
+        # cheap when most of the container is free, converting the set
+        # to a list is O(free positions)
+        width, height, r = self.container.width, self.container.height, self.radius
+        for probe in range(0, OccupancyMask.PROBES):
+            point = self.rng.randint(r, width - r - 1), self.rng.randint(r, height - r - 1)
+            if point in free:
+                break
+        else:
+            point = self.rng.choice(list(free))
+
+        with self.phase("candidate_cleanup"):
+            self.center_coords_cleanup(free, point)
+        return point
+
+    def check(self, num_items, radius):
+        """
+        Raise an error if num_items circles of radius certainly can't be
+        arranged in the layout.
+
+        Random placement may still fail for fewer items than
+        max_items() returns.
+        """
+        super(RandomLayout, self).check(num_items, radius)
+
+        if num_items > self.max_items(radius):
+            raise LayoutError("couldn't place all items in the container")
+
+    def max_items(self, radius):
+        """
+        Returns the largest number of circles of radius that fit in the
+        container: centers at least 2 * radius + 1 apart in x or y
+        direction, packed in a grid.
+        """
+        distance = radius * 2 + 1
+        columns = max([0, self.container.width - (radius * 2)])
+        rows = max([0, self.container.height - (radius * 2)])
+        return ((columns + distance - 1) / distance) * ((rows + distance - 1) / distance)
 
     def item_coordinates(self, num_items):
-        center_coords = self.center_coords()
+        if num_items > self.max_items(self.radius):
+            # no point in placing items that can't all fit
+            raise LayoutError("couldn't place all items in the container")
+
+        if self.engine in self.SAMPLE_ENGINES:
+            return self.poisson_item_coordinates(num_items)
+
+        with self.phase("candidates"):
+            if self.engine == "bitmap":
+                center_coords = OccupancyMask(self.container.width, self.container.height, self.radius)
+            else:
+                center_coords = self.center_coords(self.deadline)
+
+        stats = self.stats
+        if stats is not None:
+            stats.count("candidates", len(center_coords))
 
         coords = []
         for i in range(0, num_items):
             if not center_coords:
                 break
 
-            point = random.choice(list(center_coords))
+            if self.deadline is not None and self.deadline.expired():
+                self.deadline.check(self.placed_items(coords))
+
+            if self.engine == "bitmap":
+                point = center_coords.choice(self.rng)
+                with self.phase("candidate_cleanup"):
+                    center_coords.exclude(point)
+            else:
+                point = self.rng.choice(list(center_coords))
+
+                # remove selected coordinate and all points now taken by
+                # the item from the available coordinate set
+                with self.phase("candidate_cleanup"):
+                    self.center_coords_cleanup(center_coords, point)
+
             coords.append(point)
 
-            # remove selected coordinate and all points now taken by
-            # the item from the available coordinate set
-            self.center_coords_cleanup(center_coords, point)
+        if stats is not None:
+            stats.count("candidates_left", len(center_coords))
 
         if len(coords) < num_items:
             raise LayoutError("couldn't place all items in the container")
 
         return coords
 
-    def center_coords(self):
+    def poisson_item_coordinates(self, num_items):
+        """
+        Returns num_items random coordinates, thrown at random positions
+        if the layout is sparse or otherwise randomly selected from a
+        Poisson-disk sample of the container.
+        """
+        if num_items * self.SPARSE_FACTOR <= self.max_items(self.radius):
+            with self.phase("candidates"):
+                points = dart_throw_sample(self.container.width, self.container.height, self.radius,
+                                           num_items, self.rng, deadline=self.deadline)
+            if len(points) == num_items:
+                if self.stats is not None:
+                    self.stats.count("candidates", len(points))
+                return points
+            if self.deadline is not None:
+                self.deadline.check(self.placed_items(points))
+
+        with self.phase("candidates"):
+            points = self.sample_centers()
+
+        if self.stats is not None:
+            self.stats.count("candidates", len(points))
+
+        if self.deadline is not None and len(points) < num_items:
+            # sampling stops early when the deadline expires
+            self.deadline.check(self.placed_items(points))
+
+        if len(points) < num_items:
+            raise LayoutError("couldn't place all items in the container")
+
+        return self.rng.sample(points, num_items)
+
+    def sample_centers(self):
+        """
+        Returns Poisson-disk sample of item centers in the container,
+        computed in parallel by the parallel engine.
+        """
+        width, height = self.container.width, self.container.height
+        if self.engine == "parallel":
+            return parallel_sample(width, height, self.radius, self.rng, self.workers, self.deadline)
+        return poisson_disk_sample(width, height, self.radius, self.rng, deadline=self.deadline)
+
+    def placed_items(self, coords):
+        """
+        Returns partial layout in format [(x, y, r), ...]: items at
+        coords, after the items of incremental layout that don't move.
+        """
+        items = [(x, y, self.radius) for x, y in coords]
+        if self.incremental:
+            items = self.as_tuples() + items
+        return items
+
+    def center_coords(self, deadline=None):
         """
         Return set of all possible center positions for circles.
         """
         coords = set()
         for x in range(self.radius, self.container.width - self.radius):
+            if deadline is not None:
+                deadline.check()
             for y in range(self.radius, self.container.height - self.radius):
                 coords.add((x, y))
 
@@ -251,3 +1201,34 @@ class RandomLayout(BaseLayout):
                     coords.remove((x, y))
 
         return coords
+
+
+LAYOUT_CLASSES = {
+    "horizontal_line": HorizontalLineLayout,
+    "grid": GridLayout,
+    "circle": CircleLayout,
+    "random": RandomLayout,
+}
+
+
+def optimal_radius(layout_type, width, height, num_items):
+    """
+    Returns the largest radius of num_items circles that can be
+    arranged in layout_type in container of width * height, or 0 if
+    they don't fit with any radius.
+
+    For random layouts this is an upper bound.
+    """
+    layout = new_layout(layout_type, Container(width, height), 1)
+    return layout.max_radius(num_items)
+
+
+def new_layout(kind, container, radius, **kwargs):
+    """
+    Returns a new empty layout of kind, one of LAYOUT_CLASSES.
+    """
+    assert kind in LAYOUT_CLASSES, "layout must be one of %s" % ", ".join(sorted(LAYOUT_CLASSES))
+
+    if kind == "random":
+        return RandomLayout(radius, container, **kwargs)
+    return LAYOUT_CLASSES[kind](container, **kwargs)
@@ -0,0 +1,136 @@
+import sys
+import struct
+
+from array import array
+from itertools import izip
+
+
+# * repr - Python list of tuples, [(x0, y0, r0), (x1, y1, r1), ...]
+# * binary - little-endian 32-bit integers x, y, r of each item
+# * npy - NumPy array of shape (num_items, 3)
+# * csv - x,y,r header and one line per item
+# * ndjson - JSON array [x, y, r] per line
+FORMATS = ("repr", "binary", "npy", "csv", "ndjson")
+
+# number of items packed at a time by binary formats
+CHUNK_ITEMS = 4096
+
+NPY_MAGIC = "\x93NUMPY\x01\x00"
+
+
+def iter_write(items, f, format="repr", num_items=None):
+    """
+    Writes items in format (x, y, r) to file f in format, one of
+    FORMATS, while passing them through one by one. Nothing is written
+    until the returned generator is consumed.
+
+    The npy format needs num_items in advance.
+    """
+    assert format in FORMATS, "format must be one of %s" % ", ".join(FORMATS)
+    return WRITERS[format](items, f, num_items)
+
+
+def write_columns(storage, f, format="repr"):
+    """
+    Writes items of ItemArray storage to file f in format. Binary
+    formats are written straight from the coordinate arrays.
+    """
+    assert format in FORMATS, "format must be one of %s" % ", ".join(FORMATS)
+
+    num_items = len(storage)
+    columns = (storage.xs, storage.ys, storage.radii)
+
+    if format == "npy":
+        # column-major order is stored as the arrays are
+        f.write(npy_header(num_items, fortran_order=True))
+        for column in columns:
+            write_array(column, f)
+    elif format == "binary":
+        for start in xrange(0, num_items, CHUNK_ITEMS):
+            stop = min(start + CHUNK_ITEMS, num_items)
+            rows = array(storage.TYPECODE, [0]) * ((stop - start) * 3)
+            for i, column in enumerate(columns):
+                rows[i::3] = column[start:stop]
+            write_array(rows, f)
+    else:
+        for item in iter_write(izip(*columns), f, format, num_items):
+            pass
+
+
+def write_repr(items, f, num_items=None):
+    """
+    Writes items in the same format as the list of tuples is printed.
+    """
+    f.write("[")
+    for i, item in enumerate(items):
+        if i > 0:
+            f.write(", ")
+        f.write(repr(item))
+        yield item
+    f.write("]\n")
+
+
+def write_binary(items, f, num_items=None):
+    rows = array("i")
+    for item in items:
+        rows.extend(item)
+        yield item
+        if len(rows) >= CHUNK_ITEMS * 3:
+            write_array(rows, f)
+            del rows[:]
+    write_array(rows, f)
+
+
+def write_npy(items, f, num_items=None):
+    assert num_items is not None, "npy format needs number of items"
+
+    f.write(npy_header(num_items))
+    for item in write_binary(items, f):
+        yield item
+
+
+def write_csv(items, f, num_items=None):
+    f.write("x,y,r\n")
+    for item in items:
+        f.write("%d,%d,%d\n" % item)
+        yield item
+
+
+def write_ndjson(items, f, num_items=None):
+    for item in items:
+        f.write("[%d, %d, %d]\n" % item)
+        yield item
+
+
+WRITERS = {
+    "repr": write_repr,
+    "binary": write_binary,
+    "npy": write_npy,
+    "csv": write_csv,
+    "ndjson": write_ndjson,
+}
+
+
+def write_array(values, f):
+    """
+    Writes array of 32-bit integers to f in little-endian byte order.
+    """
+    assert values.itemsize == 4, "only 32-bit integers are supported"
+
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    f.write(values.tostring())
+
+
+def npy_header(num_items, fortran_order=False):
+    """
+    Returns header of version 1.0 .npy file of 32-bit integer array of
+    shape (num_items, 3).
+    """
+    header = "{'descr': '<i4', 'fortran_order': %s, 'shape': (%d, 3), }" % (fortran_order, num_items)
+
+    # data starts at a multiple of 64 bytes, header ends with a newline
+    size = len(NPY_MAGIC) + 2 + len(header) + 1
+    header += " " * (-size % 64) + "\n"
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header
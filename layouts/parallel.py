@@ -0,0 +1,129 @@
+import random
+
+from .deadline import Deadline
+from .index import SpatialHash
+from .sampling import poisson_disk_sample
+
+
+# strips narrower than this many item distances lose too much space to
+# border conflicts
+MIN_STRIP_ITEMS = 4
+
+# number of strips of wide containers. It doesn't depend on number of
+# workers, so that seeded samples are the same on every machine
+MAX_STRIPS = 16
+
+# random candidates tried per item distance of border length when
+# filling the space freed along the strip borders
+BORDER_ATTEMPTS = 30
+
+
+def strips(width, radius, num_strips=MAX_STRIPS):
+    """
+    Returns list of ranges [(x0, x1), ...] of item center x coordinates
+    splitting the container of width into at most num_strips vertical
+    strips.
+    """
+    distance = radius * 2 + 1
+    num_strips = max([1, min([num_strips, width / (distance * MIN_STRIP_ITEMS)])])
+
+    bounds = [(width * i) / num_strips for i in range(0, num_strips + 1)]
+    return zip(bounds, bounds[1:])
+
+
+def sample_strip(task, deadline=None):
+    """
+    Returns Poisson-disk sample of item centers with x coordinate in
+    range x0 to x1 of the container of width * height. Items can reach
+    over the strip borders, but not over container bounds.
+
+    Sampling stops after timeout seconds of the task, or when deadline
+    expires if it's given.
+    """
+    x0, x1, width, height, radius, seed, timeout = task
+    if deadline is None:
+        deadline = Deadline(timeout)
+
+    left = max([x0 - radius, 0])
+    right = min([x1 + radius, width])
+    points = poisson_disk_sample(right - left, height, radius, random.Random(seed), deadline=deadline)
+    return [(x + left, y) for x, y in points]
+
+
+def resolve_conflicts(samples, radius):
+    """
+    Merges samples of all strips and drops items intersecting with
+    items of the previous strips. Returns the kept items and spatial
+    hash of their boxes.
+    """
+    index = SpatialHash(radius * 2 + 1)
+    kept = []
+    for points in samples:
+        for x, y in points:
+            if index.add((x - radius, y - radius, x + radius, y + radius)):
+                kept.append((x, y))
+    return kept, index
+
+
+def fill_borders(points, index, bounds, width, height, radius, rng, deadline=None):
+    """
+    Tries to place more items in the space freed by dropped items along
+    the strip borders.
+    """
+    distance = radius * 2 + 1
+    attempts = BORDER_ATTEMPTS * max([1, height / distance])
+
+    for x0, x1 in bounds[1:]:
+        if deadline is not None and deadline.expired():
+            break
+        x_min = max([x0 - distance, radius])
+        x_max = min([x0 + distance, width - radius - 1])
+        for attempt in range(0, attempts):
+            x = rng.randint(x_min, x_max)
+            y = rng.randint(radius, height - radius - 1)
+            if index.add((x - radius, y - radius, x + radius, y + radius)):
+                points.append((x, y))
+
+    return points
+
+
+def parallel_sample(width, height, radius, rng=random, workers=None, deadline=None):
+    """
+    Returns list of non-overlapping item centers [(x, y), ...] covering
+    the container of width * height, computed in parallel.
+
+    The container is split into vertical strips, which are sampled in
+    a pool of worker processes with their own seeded random number
+    generators. Items intersecting across strip borders are dropped,
+    then the borders are filled serially. Strips depend only on the
+    container, so the sample doesn't depend on number of workers.
+
+    Daemonic processes, e.g. workers of another pool, can't have
+    children, there the strips are sampled serially.
+
+    If deadline expires, points generated until then are returned.
+    """
+    # multiprocessing is imported only when it's used, it slows down
+    # importing layouts
+    from multiprocessing import Pool, cpu_count, current_process
+
+    workers = workers or cpu_count()
+    if width < radius * 2 + 1 or height < radius * 2 + 1:
+        return []
+
+    bounds = strips(width, radius)
+    timeout = deadline.remaining() if deadline is not None else None
+    tasks = [(x0, x1, width, height, radius, rng.randint(0, 2 ** 31), timeout) for x0, x1 in bounds]
+
+    if len(tasks) == 1 or workers == 1 or current_process().daemon:
+        samples = [sample_strip(task, deadline) for task in tasks]
+    else:
+        pool = Pool(min([workers, len(tasks)]))
+        try:
+            samples = pool.map(sample_strip, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    points, index = resolve_conflicts(samples, radius)
+    return fill_borders(points, index, bounds, width, height, radius, rng, deadline)
@@ -1,4 +1,6 @@
 class Item(object):
+    __slots__ = ("x", "y")
+
     # size of square box to fit smallest possible circle
     MIN_SIDE_SIZE = 3
 
@@ -27,6 +29,8 @@ class Item(object):
 
 
 class Circle(Item):
+    __slots__ = ("radius", )
+
     def __init__(self, radius=None, **kwargs):
         super(Circle, self).__init__(**kwargs)
 
@@ -71,10 +75,41 @@ class Container(object):
         sh = self.height - (self.height % size)
         return (sw * sh) / (size * size)
 
+    def max_items(self, layout_type, radius):
+        """
+        Returns the largest number of circles of radius that can be
+        arranged in the container in layout_type, a layout class or
+        one of "horizontal_line", "grid", "circle" or "random".
+
+        For random layouts this is an upper bound.
+        """
+        from .layouts import new_layout, LAYOUT_CLASSES
+
+        if not isinstance(layout_type, basestring):
+            layout_type = [kind for kind, cls in LAYOUT_CLASSES.items() if cls is layout_type][0]
+
+        return new_layout(layout_type, self, radius).max_items(radius)
+
     def within_bounds(self, item):
         """
         Returns True if box containing item is within container
         bounds, otherwise False.
         """
-        x0, y0, x1, y1 = item.box_coordinates()
+        return self.box_within_bounds(item.box_coordinates())
+
+    def box_within_bounds(self, box):
+        """
+        Returns True if box in format (x0, y0, x1, y1) is within
+        container bounds, otherwise False.
+        """
+        x0, y0, x1, y1 = box
         return x0 >= 0 and y0 >= 0 and x1 < self.width and y1 < self.height
+
+    def within_bounds_all(self, xs, ys, radii):
+        """
+        Returns True if boxes of all items with centers and radii in
+        numpy arrays xs, ys and radii are within container bounds,
+        otherwise False.
+        """
+        return bool(((xs - radii >= 0) & (ys - radii >= 0) &
+                     (xs + radii < self.width) & (ys + radii < self.height)).all())
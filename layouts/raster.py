@@ -0,0 +1,136 @@
+import mmap
+import struct
+
+from collections import defaultdict
+
+
+FORMATS = ("bmp", "pbm")
+
+# height of a tile in rows, tiles span the whole width of the image
+TILE_ROWS = 256
+
+# PBM stores black pixels as 1 bits
+INVERT = bytearray(255 - i for i in range(0, 256))
+
+
+def image_layout(width, height, format):
+    """
+    Returns header and row size in bytes of 1-bit image of width *
+    height in format, one of FORMATS.
+    """
+    if format == "pbm":
+        return "P4\n%d %d\n" % (width, height), (width + 7) / 8
+
+    # BMP rows are padded to 4 bytes
+    stride = ((width + 31) / 32) * 4
+    palette = struct.pack("<8B", 0, 0, 0, 0, 255, 255, 255, 0)
+    offset = 14 + 40 + len(palette)
+    header = struct.pack("<2sIHHI", "BM", offset + stride * height, 0, 0, offset) + \
+        struct.pack("<IiiHHIIiiII", 40, width, height, 1, 1, 0, stride * height, 2835, 2835, 2, 0) + \
+        palette
+    return header, stride
+
+
+def write_tiled(items, width, height, f, format="bmp", tile_rows=TILE_ROWS):
+    """
+    Draws items in format [(x, y, r), ...] as white disks on black
+    background of width * height and writes 1-bit image in format to
+    file f.
+
+    The image is rasterized one tile of tile_rows rows at a time in the
+    order rows are stored in the file, each tile only draws the items
+    whose boxes cross it. Memory used for pixels is bounded by the tile
+    size.
+    """
+    assert format in FORMATS, "format must be one of %s" % ", ".join(FORMATS)
+
+    header, stride = image_layout(width, height, format)
+    f.write(header)
+
+    tiles = defaultdict(list)
+    for x, y, r in items:
+        for tile in range(max(y - r, 0) / tile_rows, min(y + r, height - 1) / tile_rows + 1):
+            tiles[tile].append((x, y, r))
+
+    num_tiles = (height + tile_rows - 1) / tile_rows
+    # BMP rows are stored bottom-up
+    order = reversed(range(0, num_tiles)) if format == "bmp" else range(0, num_tiles)
+
+    for tile in order:
+        top = tile * tile_rows
+        rows = min(tile_rows, height - top)
+        pixels = bytearray(stride * rows)
+        for x, y, r in tiles.pop(tile, ()):
+            draw_disk(pixels, stride, width, top, rows, x, y, r)
+
+        if format == "bmp":
+            for row in reversed(range(0, rows)):
+                f.write(str(pixels[row * stride:(row + 1) * stride]))
+        else:
+            f.write(str(pixels.translate(INVERT)))
+
+
+def write_tiled_file(items, width, height, path, format="bmp", tile_rows=TILE_ROWS):
+    """
+    Same as write_tiled(), but the image is written to the memory-mapped
+    file at path.
+    """
+    header, stride = image_layout(width, height, format)
+    size = len(header) + stride * height
+
+    with open(path, "w+b") as f:
+        f.truncate(size)
+        image = mmap.mmap(f.fileno(), size)
+        try:
+            write_tiled(items, width, height, image, format, tile_rows)
+            image.flush()
+        finally:
+            image.close()
+
+
+def draw_disk(pixels, stride, width, top, rows, x, y, r):
+    """
+    Sets bits of all pixels of disk of radius r at (x, y) within the
+    tile of rows starting at row top.
+
+    Pixels whose centers are within r + 0.5 of (x, y) are set, which is
+    the extent of disks drawn by Pillow: (dx^2 + dy^2 <= (r + 0.5)^2)
+    is the same as (dx^2 + dy^2 <= r^2 + r) for integers.
+    """
+    for py in range(max(y - r, top), min(y + r, top + rows - 1) + 1):
+        dy = py - y
+        half = isqrt(r * r + r - dy * dy)
+        x0 = max(x - half, 0)
+        x1 = min(x + half, width - 1)
+        if x0 <= x1:
+            fill_span(pixels, (py - top) * stride, x0, x1)
+
+
+def fill_span(pixels, offset, x0, x1):
+    """
+    Sets bits x0 to x1 inclusive of the row starting at offset, most
+    significant bit first.
+    """
+    first, last = offset + (x0 >> 3), offset + (x1 >> 3)
+    head = 0xFF >> (x0 & 7)
+    tail = (0xFF << (7 - (x1 & 7))) & 0xFF
+
+    if first == last:
+        pixels[first] |= head & tail
+        return
+
+    pixels[first] |= head
+    pixels[first + 1:last] = "\xff" * (last - first - 1)
+    pixels[last] |= tail
+
+
+def isqrt(n):
+    """
+    Returns the largest integer whose square is not greater than n.
+    """
+    root = int(n ** 0.5)
+    while root * root > n:
+        root -= 1
+    while (root + 1) * (root + 1) <= n:
+        root += 1
+    return root
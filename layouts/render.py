@@ -0,0 +1,87 @@
+from os.path import splitext
+
+
+# rendering backends are imported when they are used, so that
+# generating coordinates doesn't pay for importing Pillow
+
+FORMATS = ("bmp", "png", "svg", "pbm")
+
+# formats of raster.write_tiled()
+TILED_FORMATS = ("bmp", "pbm")
+
+DEFAULT_FORMAT = "bmp"
+
+
+def render(items, width, height, sink=None, format=None, tiled=False):
+    """
+    Draws items in format [(x, y, r), ...] as white circles on black
+    background of width * height and writes the image to sink.
+
+    Sink can be None (nothing is rendered), a file path or a file-like
+    object, e.g. BytesIO. Format is one of FORMATS, if not specified
+    it's guessed from the file extension.
+
+    Items are iterated over only once, so they can be passed as an
+    iterator.
+
+    If tiled is True, or format is pbm, the image is rasterized tile by
+    tile without creating the whole image in memory, and file paths are
+    written through a memory map. Only bmp and pbm formats can be tiled.
+    """
+    if sink is None:
+        return
+
+    if format is None:
+        format = guess_format(sink)
+    assert format in FORMATS, "format must be one of %s" % ", ".join(FORMATS)
+
+    if tiled or format == "pbm":
+        from . import raster
+
+        assert format in TILED_FORMATS, "tiled format must be one of %s" % ", ".join(TILED_FORMATS)
+        if hasattr(sink, "write"):
+            raster.write_tiled(items, width, height, sink, format)
+        else:
+            raster.write_tiled_file(items, width, height, sink, format)
+    elif format == "svg":
+        if hasattr(sink, "write"):
+            write_svg(items, width, height, sink)
+        else:
+            with open(sink, "wb") as f:
+                write_svg(items, width, height, f)
+    else:
+        bitmap(items, width, height).save(sink, format)
+
+
+def guess_format(sink):
+    """
+    Returns image format based on file extension of the sink path.
+    """
+    name = sink if isinstance(sink, basestring) else getattr(sink, "name", "")
+    ext = splitext(name)[1][1:].lower()
+    return ext if ext in FORMATS else DEFAULT_FORMAT
+
+
+def bitmap(items, width, height):
+    """
+    Returns 1-bit Pillow image of the items.
+    """
+    from PIL import Image, ImageDraw
+
+    img = Image.new("1", (width, height))
+    draw = ImageDraw.Draw(img)
+    for x, y, r in items:
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=1)
+    del draw
+    return img
+
+
+def write_svg(items, width, height, f):
+    """
+    Writes SVG document of the items to file f.
+    """
+    f.write('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d">\n' % (width, height))
+    f.write('<rect width="100%" height="100%" fill="black"/>\n')
+    for x, y, r in items:
+        f.write('<circle cx="%d" cy="%d" r="%d" fill="white"/>\n' % (x, y, r))
+    f.write('</svg>\n')
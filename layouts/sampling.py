@@ -0,0 +1,178 @@
+import random
+
+from .compat import numpy
+
+
+class PointGrid(object):
+    """
+    Acceleration grid of points at least distance apart in x or y
+    direction, with at most one point per cell, so checking a new point
+    is O(1) and memory is proportional to number of points.
+    """
+    def __init__(self, distance):
+        self.distance = distance
+        self.cells = {}
+        self.points = []
+
+    def fits(self, x, y):
+        """
+        Returns True if point (x, y) is at least distance away from all
+        points in the grid.
+        """
+        distance = self.distance
+        cx, cy = x // distance, y // distance
+        for gx in range(cx - 1, cx + 2):
+            for gy in range(cy - 1, cy + 2):
+                point = self.cells.get((gx, gy))
+                if point is not None and \
+                   abs(point[0] - x) < distance and abs(point[1] - y) < distance:
+                    return False
+        return True
+
+    def insert(self, x, y):
+        self.cells[(x // self.distance, y // self.distance)] = (x, y)
+        self.points.append((x, y))
+
+
+def poisson_disk_sample(width, height, radius, rng=random, attempts=30, deadline=None):
+    """
+    Returns list of center coordinates [(x, y), ...] for circles of
+    radius placed in the container of width * height so that their
+    bounding boxes don't intersect.
+
+    Uses Bridson's algorithm: new points are generated in the ring
+    between 1 and 2 minimum distances around randomly chosen active
+    points until no active points are left. Distances are measured
+    as max(|dx|, |dy|) to match bounding box intersection.
+
+    If deadline expires, points generated until then are returned.
+    """
+    distance = radius * 2 + 1
+
+    # range of centers that keep the whole circle within the container
+    x_min, x_max = radius, width - radius - 1
+    y_min, y_max = radius, height - radius - 1
+    if x_min > x_max or y_min > y_max:
+        return []
+
+    grid = PointGrid(distance)
+    active = []
+
+    def insert(x, y):
+        grid.insert(x, y)
+        active.append((x, y))
+
+    insert(rng.randint(x_min, x_max), rng.randint(y_min, y_max))
+
+    while active:
+        if deadline is not None and deadline.expired():
+            break
+
+        i = rng.randrange(len(active))
+        px, py = active[i]
+
+        for attempt in range(0, attempts):
+            dx = rng.randint(-2 * distance, 2 * distance)
+            dy = rng.randint(-2 * distance, 2 * distance)
+            if max(abs(dx), abs(dy)) < distance:
+                # point too close to the active point
+                continue
+
+            x, y = px + dx, py + dy
+            if x_min <= x <= x_max and y_min <= y <= y_max and grid.fits(x, y):
+                insert(x, y)
+                break
+        else:
+            # no space left around this point, retire it
+            active[i] = active[-1]
+            active.pop()
+
+    return grid.points
+
+
+def dart_throw_sample(width, height, radius, num_items, rng=random, attempts=30, deadline=None):
+    """
+    Returns up to num_items center coordinates [(x, y), ...] of circles
+    of radius at uniformly random positions in the container of width *
+    height, with bounding boxes that don't intersect.
+
+    Candidates are thrown at random and kept if they don't intersect
+    the points kept so far, time and memory grow with num_items instead
+    of the container size. Gives up after attempts * num_items rejected
+    candidates, so it's meant for sparse layouts; dense ones need
+    poisson_disk_sample().
+
+    If deadline expires, points generated until then are returned.
+    """
+    # range of centers that keep the whole circle within the container
+    x_min, x_max = radius, width - radius - 1
+    y_min, y_max = radius, height - radius - 1
+    if x_min > x_max or y_min > y_max:
+        return []
+
+    grid = PointGrid(radius * 2 + 1)
+    rejected = 0
+    while len(grid.points) < num_items and rejected < attempts * num_items:
+        if deadline is not None and deadline.expired():
+            break
+
+        x, y = rng.randint(x_min, x_max), rng.randint(y_min, y_max)
+        if grid.fits(x, y):
+            grid.insert(x, y)
+        else:
+            rejected += 1
+
+    return grid.points
+
+
+class OccupancyMask(object):
+    """
+    Bitmap of all positions where a center of circle of radius can
+    still be placed, one byte per pixel.
+
+    Requires numpy.
+    """
+    # number of random probes before falling back to scanning the mask
+    PROBES = 16
+
+    def __init__(self, width, height, radius):
+        self.radius = radius
+        self.free = numpy.zeros((width, height), dtype=numpy.bool_)
+        self.free[radius:width - radius, radius:height - radius] = True
+        self.count = int(self.free.sum())
+
+    def __len__(self):
+        return self.count
+
+    def choice(self, rng=random):
+        """
+        Returns random free position in format (x, y).
+        """
+        width, height = self.free.shape
+        r = self.radius
+
+        # cheap when most of the container is free
+        for probe in range(0, self.PROBES):
+            x = rng.randint(r, width - r - 1)
+            y = rng.randint(r, height - r - 1)
+            if self.free[x, y]:
+                return x, y
+
+        positions = numpy.flatnonzero(self.free)
+        x, y = divmod(int(positions[rng.randrange(len(positions))]), height)
+        return x, y
+
+    def exclude(self, point):
+        """
+        Marks positions where a circle would intersect with the circle
+        placed at point as taken.
+
+        The exclusion zone is the square of bounding boxes that would
+        intersect with the placed item, since that's what layouts
+        validate.
+        """
+        px, py = point
+        d = self.radius * 2
+        zone = self.free[max(px - d, 0):px + d + 1, max(py - d, 0):py + d + 1]
+        self.count -= int(zone.sum())
+        zone[:] = False
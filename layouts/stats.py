@@ -0,0 +1,82 @@
+import time
+
+from collections import defaultdict
+
+
+class LayoutStats(object):
+    """
+    Opt-in instrumentation of a layout: wall time spent in each phase
+    and event counters.
+
+    If callback is given it's called with (phase, seconds) every time a
+    phase finishes.
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.times = defaultdict(float)
+        self.counters = defaultdict(int)
+
+    def phase(self, name):
+        return Phase(self, name)
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def record(self, name, seconds):
+        self.times[name] += seconds
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def iterate(self, name, iterator):
+        """
+        Returns generator of items of iterator. Time spent producing
+        the items is recorded as phase name when the generator is
+        exhausted or closed.
+        """
+        elapsed = 0.0
+        iterator = iter(iterator)
+        try:
+            while True:
+                started = time.time()
+                try:
+                    item = next(iterator)
+                finally:
+                    elapsed += time.time() - started
+                yield item
+        except StopIteration:
+            pass
+        finally:
+            self.record(name, elapsed)
+
+    def as_dict(self):
+        return {"times": dict(self.times), "counters": dict(self.counters)}
+
+
+class Phase(object):
+    """
+    Context manager measuring wall time of a phase.
+    """
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.record(self.name, time.time() - self.started)
+
+
+class NoPhase(object):
+    """
+    Context manager used instead of Phase when stats are disabled.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NO_PHASE = NoPhase()
@@ -0,0 +1,116 @@
+from array import array
+from itertools import izip
+
+from .primitives import Circle
+from .compat import numpy
+
+
+class CircleView(Circle):
+    """
+    Circle stored at index of ItemArray. Reads and writes go straight
+    to the arrays.
+    """
+    __slots__ = ("storage", "index")
+
+    def __init__(self, storage, index):
+        self.storage = storage
+        self.index = index
+
+    @property
+    def x(self):
+        return self.storage.xs[self.index]
+
+    @x.setter
+    def x(self, value):
+        self.storage.xs[self.index] = value
+
+    @property
+    def y(self):
+        return self.storage.ys[self.index]
+
+    @y.setter
+    def y(self, value):
+        self.storage.ys[self.index] = value
+
+    @property
+    def radius(self):
+        return self.storage.radii[self.index]
+
+
+class ItemArray(object):
+    """
+    Compact list-like storage of circles, x, y and radius of all items
+    are kept in three typed arrays instead of one object per item.
+
+    Indexing and iterating returns CircleView instances.
+    """
+    TYPECODE = "i"
+
+    def __init__(self, items=()):
+        self.xs = array(self.TYPECODE)
+        self.ys = array(self.TYPECODE)
+        self.radii = array(self.TYPECODE)
+        self.extend(items)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("item index out of range")
+        return CircleView(self, index)
+
+    def __iter__(self):
+        for i in xrange(0, len(self)):
+            yield CircleView(self, i)
+
+    def append(self, item):
+        self.xs.append(item.x)
+        self.ys.append(item.y)
+        self.radii.append(item.radius)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def extend_circles(self, num_items, radius):
+        """
+        Appends num_items circles of radius at (0, 0), without creating
+        an object per item.
+        """
+        zeros = array(self.TYPECODE, [0]) * num_items
+        self.xs.extend(zeros)
+        self.ys.extend(zeros)
+        self.radii.extend(array(self.TYPECODE, [radius]) * num_items)
+
+    def set_coordinates(self, coords):
+        """
+        Moves items to coords in format [(x, y), ...], extra
+        coordinates are ignored.
+        """
+        xs, ys = self.xs, self.ys
+        for i, (x, y) in izip(xrange(0, len(self)), coords):
+            xs[i] = x
+            ys[i] = y
+
+    def set_coordinate_arrays(self, xs, ys):
+        """
+        Same as set_coordinates() for numpy arrays xs and ys, which are
+        copied straight into the storage.
+        """
+        num_items = min([len(self), len(xs)])
+        numpy.frombuffer(self.xs, dtype=numpy.intc)[:num_items] = xs[:num_items]
+        numpy.frombuffer(self.ys, dtype=numpy.intc)[:num_items] = ys[:num_items]
+
+    def box_coordinates(self):
+        """
+        Returns generator of containing boxes of all items in format
+        (x0, y0, x1, y1).
+        """
+        for x, y, r in izip(self.xs, self.ys, self.radii):
+            yield x - r, y - r, x + r, y + r
+
+    def as_tuples(self):
+        return zip(self.xs, self.ys, self.radii)
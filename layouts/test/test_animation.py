@@ -0,0 +1,70 @@
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from mock import patch
+
+from ..primitives import Container, Circle
+from ..layouts import HorizontalLineLayout, CircleLayout, GridLayout
+from ..animation import iter_frames, frame_items, render_frames, EASINGS
+
+
+class AnimationTests(TestCase):
+    def layouts(self, compact=False):
+        container = Container(width=200, height=200)
+        line = HorizontalLineLayout(container, compact=compact)
+        line.add_many([Circle(radius=5) for x in range(0, 8)])
+        circle = CircleLayout(container, compact=compact)
+        circle.add_many([Circle(radius=5) for x in range(0, 8)])
+        return line, circle
+
+    def test_first_and_last_frame(self):
+        for compact in (False, True):
+            line, circle = self.layouts(compact)
+            frames = list(iter_frames(line, circle, 10))
+            self.assertEquals(len(frames), 10)
+            self.assertEquals(list(frame_items(frames[0])), line.as_tuples())
+            self.assertEquals(list(frame_items(frames[-1])), circle.as_tuples())
+
+    def test_linear(self):
+        start = HorizontalLineLayout(Container(width=100, height=20))
+        start.add(Circle(radius=5))
+        end = HorizontalLineLayout(Container(width=100, height=80))
+        end.add(Circle(radius=5))
+
+        frames = [list(frame_items(frame)) for frame in iter_frames(start, end, 5, "linear")]
+        self.assertEquals(frames, [[(50, 9, 5)], [(50, 17, 5)], [(50, 24, 5)], [(50, 32, 5)], [(50, 39, 5)]])
+
+    def test_easing(self):
+        for easing in EASINGS.values():
+            self.assertEquals(easing(0), 0)
+            self.assertEquals(easing(1), 1)
+
+        line, circle = self.layouts()
+        frames = list(iter_frames(line, circle, 3, easing=lambda t: 0))
+        self.assertEquals(list(frame_items(frames[-1])), line.as_tuples())
+
+    def test_without_numpy(self):
+        line, circle = self.layouts()
+        expected = [list(frame_items(frame)) for frame in iter_frames(line, circle, 7)]
+        with patch("layouts.animation.numpy", None):
+            frames = [list(frame_items(frame)) for frame in iter_frames(line, circle, 7)]
+        self.assertEquals(frames, expected)
+
+    def test_different_number_of_items(self):
+        line, circle = self.layouts()
+        grid = GridLayout(Container(width=200, height=200))
+        grid.add(Circle(radius=5))
+        with self.assertRaises(AssertionError):
+            iter_frames(line, grid, 10)
+
+    def test_render_frames(self):
+        line, circle = self.layouts()
+        directory = mkdtemp()
+        try:
+            render_frames(iter_frames(line, circle, 3), 200, 200, os.path.join(directory, "frame%d.svg"))
+            self.assertEquals(sorted(os.listdir(directory)), ["frame0.svg", "frame1.svg", "frame2.svg"])
+        finally:
+            rmtree(directory)
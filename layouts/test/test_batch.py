@@ -0,0 +1,89 @@
+import json
+
+from StringIO import StringIO
+from unittest import TestCase
+
+import layouts
+
+from main import run_batch, validate_job
+
+
+JOBS = [
+    {"type": "grid", "width": 100, "height": 100, "num_items": 3, "radius": 10},
+    {"type": "random", "width": 100, "height": 100, "num_items": 3, "radius": 5, "seed": 1},
+    {"type": "horizontal_line", "width": 20, "height": 20, "num_items": 3, "radius": 5},
+    {"type": "circle", "width": 100, "height": 100, "num_items": 4, "radius": 5},
+]
+
+
+def batch(lines, workers=1, ordered=True):
+    """
+    Runs jobs from lines and returns the result records.
+    """
+    out = StringIO()
+    run_batch(lines, out, workers, ordered)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        layouts.cache.invalidate()
+
+    def test_ordered(self):
+        results = batch([json.dumps(job) for job in JOBS])
+        self.assertEquals([result["index"] for result in results], [0, 1, 2, 3])
+        self.assertEquals(results[0]["items"], [[25, 25, 10], [25, 75, 10], [75, 25, 10]])
+        self.assertEquals(results[1]["items"],
+                          [list(item) for item in layouts.random_layout(100, 100, 3, radius=5, seed=1)])
+        self.assertEquals(batch([json.dumps(job) for job in JOBS], workers=2), results)
+
+    def test_unordered(self):
+        lines = [json.dumps(job) for job in JOBS] * 5
+        results = batch(lines, workers=2, ordered=False)
+        self.assertEquals(sorted(results), sorted(batch(lines)))
+
+    def test_blank_lines(self):
+        results = batch(["", json.dumps(JOBS[0]), "  \n"])
+        self.assertEquals([result["index"] for result in results], [1])
+
+    def test_error_record(self):
+        results = batch([json.dumps(JOBS[2]), json.dumps(dict(JOBS[2], num_items=3)), json.dumps(JOBS[0])])
+        self.assertEquals(results[1], {"index": 1, "error": "item doesn't fit in the container"})
+        self.assertIn("items", results[2])
+
+    def test_malformed_lines(self):
+        lines = [
+            "not json",
+            "[1, 2]",
+            json.dumps({"type": "grid", "width": 0, "height": 100, "num_items": 3}),
+            json.dumps(dict(JOBS[1], engine="bogus")),
+            json.dumps({"type": "grid", "width": 100, "height": 100}),
+            json.dumps(JOBS[0]),
+        ]
+        for workers in (1, 2):
+            results = batch(lines, workers)
+            self.assertEquals([result["index"] for result in results], range(0, len(lines)))
+            for result in results[:-1]:
+                self.assertTrue(result["error"].startswith("invalid job: "), result)
+            self.assertIn("items", results[-1])
+
+
+class ValidateJobTests(TestCase):
+    def assert_invalid(self, job, message):
+        with self.assertRaises(ValueError) as e:
+            validate_job(job)
+        self.assertEquals(e.exception.message, message)
+
+    def test_valid(self):
+        for job in JOBS:
+            validate_job(job)
+        validate_job(dict(JOBS[1], radius=None, timeout=0.5, engine="poisson"))
+
+    def test_invalid(self):
+        self.assert_invalid([], "job must be a JSON object")
+        self.assert_invalid(dict(JOBS[0], type="hexagon"),
+                            "type must be one of horizontal_line, random, grid, circle")
+        self.assert_invalid(dict(JOBS[0], height="100"), "height must be an integer of at least 1")
+        self.assert_invalid(dict(JOBS[0], num_items=-1), "num_items must be an integer of at least 0")
+        self.assert_invalid(dict(JOBS[0], radius=0), "radius must be an integer of at least 1")
+        self.assert_invalid(dict(JOBS[0], timeout="soon"), "timeout must be a non-negative number")
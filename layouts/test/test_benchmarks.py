@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from benchmarks.suite import Case, cases, compare, run_case
+
+
+def report(**metrics):
+    """
+    Returns report with a single result named "case" with metrics.
+    """
+    result = {"name": "case"}
+    result.update(metrics)
+    return {"results": [result]}
+
+
+class CompareTests(TestCase):
+    def test_threshold(self):
+        baseline = report(time=1.0, peak_memory_kb=10000)
+        self.assertEquals(compare(baseline, report(time=1.1, peak_memory_kb=11000)), [])
+        self.assertEquals(compare(baseline, report(time=1.3, peak_memory_kb=10000)),
+                          [("case", "time", 1.0, 1.3)])
+        self.assertEquals(sorted(compare(baseline, report(time=1.1, peak_memory_kb=11000), threshold=0.05)),
+                          [("case", "peak_memory_kb", 10000, 11000), ("case", "time", 1.0, 1.1)])
+
+    def test_noise(self):
+        # growth of fast cases within measurement noise isn't a regression
+        baseline = report(time=0.0001, render_time=0.01, peak_memory_kb=100)
+        self.assertEquals(compare(baseline, report(time=0.0009, render_time=0.0105, peak_memory_kb=300)), [])
+        self.assertEquals(sorted(compare(baseline, report(time=0.002, render_time=0.0105, peak_memory_kb=400))),
+                          [("case", "peak_memory_kb", 100, 400), ("case", "time", 0.0001, 0.002)])
+
+    def test_missing(self):
+        baseline = report(time=1.0)
+        self.assertEquals(compare(baseline, {"results": [{"name": "other", "time": 2.0}]}), [])
+        self.assertEquals(compare(baseline, report(error="couldn't place all items in the container")), [])
+
+
+class CaseTests(TestCase):
+    def test_large_tier(self):
+        self.assertTrue(max([case.num_items for case in cases()]) >= 1000)
+        self.assertEquals(max([case.num_items for case in cases(large=False)]), 100)
+
+    def test_run_case(self):
+        result = run_case(Case("grid", {}, 100, 100, 3, 10), repeat=1, memory=False)
+        self.assertEquals(result["name"], "grid/100x100/n=3/r=10")
+        self.assertTrue(result["time"] >= 0)
+        self.assertTrue(result["render_time"] >= 0)
+
+        result = run_case(Case("horizontal_line", {}, 20, 20, 3, 5), repeat=1, memory=False)
+        self.assertEquals(result["error"], "item doesn't fit in the container")
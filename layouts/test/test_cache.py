@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+import layouts
+
+from ..cache import LayoutCache
+from ..errors import LayoutError
+
+
+class LayoutCacheTests(TestCase):
+    def test_hits_and_misses(self):
+        cache = LayoutCache(maxsize=2)
+        self.assertEquals(cache.get("a", lambda: [1]), [1])
+        self.assertEquals(cache.get("a", lambda: [2]), [1])
+        self.assertEquals((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = LayoutCache(maxsize=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        cache.get("a", lambda: [])
+        cache.put("c", [3])
+        self.assertEquals(len(cache), 2)
+        self.assertEquals(cache.get("b", lambda: ["miss"]), ["miss"])
+        self.assertEquals(cache.get("a", lambda: ["miss"]), ["miss"])
+
+    def test_resize(self):
+        cache = LayoutCache(maxsize=3)
+        for key in "abc":
+            cache.put(key, [key])
+        cache.resize(1)
+        self.assertEquals(len(cache), 1)
+        self.assertEquals(cache.get("c", lambda: ["miss"]), ["c"])
+
+    def test_invalidate(self):
+        cache = LayoutCache()
+        cache.put("a", [1])
+        cache.put("b", [2])
+        cache.invalidate("a")
+        self.assertEquals(len(cache), 1)
+        cache.invalidate()
+        self.assertEquals(len(cache), 0)
+
+    def test_errors_not_cached(self):
+        def compute():
+            raise LayoutError("overlapping items")
+
+        cache = LayoutCache()
+        with self.assertRaises(LayoutError):
+            cache.get("a", compute)
+        self.assertEquals(len(cache), 0)
+
+    def test_result_is_copied(self):
+        cache = LayoutCache()
+        cache.get("a", lambda: [1]).append(2)
+        self.assertEquals(cache.get("a", lambda: []), [1])
+
+
+class LayoutFunctionCacheTests(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, layouts, "radius", layouts.radius)
+        layouts.radius = 1
+        layouts.cache.invalidate()
+
+    def test_deterministic_layout_cached(self):
+        result = layouts.horizontal_line_layout(6, 3, 2)
+        misses = layouts.cache.misses
+        self.assertEquals(layouts.horizontal_line_layout(6, 3, 2), result)
+        self.assertEquals(layouts.cache.misses, misses)
+
+    def test_radius_is_part_of_key(self):
+        layouts.horizontal_line_layout(20, 10, 2)
+        layouts.radius = 2
+        self.assertEquals(layouts.horizontal_line_layout(20, 10, 2), [(5, 4, 2), (15, 4, 2)])
+
+    def test_random_layout_cached_with_seed(self):
+        result = layouts.random_layout(50, 50, 5, seed=1)
+        self.assertEquals(layouts.random_layout(50, 50, 5, seed=1), result)
+        self.assertEquals(len(layouts.cache), 1)
+
+        layouts.random_layout(50, 50, 5)
+        self.assertEquals(len(layouts.cache), 1)
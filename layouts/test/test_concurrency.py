@@ -0,0 +1,65 @@
+import random
+import threading
+
+from unittest import TestCase
+
+import layouts
+
+from ..primitives import Container, Circle
+from ..layouts import RandomLayout
+from ..errors import LayoutError
+
+
+class ReentrantLayoutTests(TestCase):
+    def setUp(self):
+        layouts.cache.invalidate()
+        self.addCleanup(setattr, layouts, "radius", layouts.radius)
+
+    def test_radius_parameter(self):
+        layouts.radius = 1
+        self.assertEquals(layouts.horizontal_line_layout(20, 10, 2, radius=2), [(5, 4, 2), (15, 4, 2)])
+        self.assertEquals(layouts.horizontal_line_layout(20, 10, 2), [(5, 4, 1), (15, 4, 1)])
+
+    def test_random_layout_rng(self):
+        first = layouts.random_layout(50, 50, 5, radius=2, rng=random.Random(1))
+        second = layouts.random_layout(50, 50, 5, radius=2, rng=random.Random(1))
+        self.assertEquals(first, second)
+        self.assertEquals(len(layouts.cache), 0)
+
+    def test_seed_doesnt_touch_global_random(self):
+        random.seed(1)
+        expected = random.random()
+
+        random.seed(1)
+        RandomLayout(1, Container(width=30, height=30), seed=2).add(Circle(radius=1))
+        self.assertEquals(random.random(), expected)
+
+    def test_layouts_in_threads(self):
+        results = {}
+
+        def worker(i):
+            results[i] = layouts.random_layout(60, 60, 5, seed=i, radius=i % 3 + 1)
+
+        threads = [threading.Thread(target=worker, args=(i, )) for i in range(0, 8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        layouts.cache.invalidate()
+        for i in range(0, 8):
+            self.assertEquals(results[i], layouts.random_layout(60, 60, 5, seed=i, radius=i % 3 + 1))
+
+
+class LayoutManyTests(TestCase):
+    def test_layout_many(self):
+        jobs = [
+            ("grid", 100, 100, 4, {"radius": 5}),
+            ("horizontal_line", 3, 3, 2, {"radius": 1}),
+            ("random", 50, 50, 3, {"radius": 2, "seed": 1}),
+        ]
+        results = layouts.layout_many(jobs, workers=2)
+
+        self.assertEquals(results[0], layouts.grid_layout(100, 100, 4, radius=5))
+        self.assertIsInstance(results[1], LayoutError)
+        self.assertEquals(results[2], layouts.random_layout(50, 50, 3, radius=2, seed=1))
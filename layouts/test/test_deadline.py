@@ -0,0 +1,151 @@
+import time
+
+from multiprocessing import TimeoutError
+from unittest import TestCase, skipIf
+
+from mock import patch
+
+import layouts
+
+from ..primitives import Container, Circle
+from ..layouts import RandomLayout, GridLayout
+from ..errors import LayoutError, LayoutTimeout
+from ..deadline import Deadline, LayoutTask
+from ..compat import numpy
+
+
+class DeadlineTests(TestCase):
+    def test_no_limit(self):
+        deadline = Deadline()
+        self.assertFalse(deadline.expired())
+        self.assertIsNone(deadline.remaining())
+        deadline.check()
+
+    def test_remaining(self):
+        deadline = Deadline(60)
+        self.assertTrue(0 < deadline.remaining() <= 60)
+        deadline.cancel()
+        self.assertEquals(deadline.remaining(), 0.0)
+
+    def test_expired(self):
+        deadline = Deadline(0)
+        self.assertTrue(deadline.expired())
+        with self.assertRaises(LayoutTimeout) as e:
+            deadline.check([(1, 1, 1)])
+        self.assertEquals(e.exception.message, "layout timed out")
+        self.assertEquals(e.exception.items, [(1, 1, 1)])
+
+    def test_cancel(self):
+        deadline = Deadline(60)
+        deadline.cancel()
+        with self.assertRaises(LayoutTimeout) as e:
+            deadline.check()
+        self.assertEquals(e.exception.message, "layout cancelled")
+
+    def test_timeout_is_layout_error(self):
+        self.assertTrue(issubclass(LayoutTimeout, LayoutError))
+
+
+class LayoutDeadlineTests(TestCase):
+    def expire_after(self, checks):
+        """
+        Returns deadline that expires after number of checks.
+        """
+        deadline = Deadline()
+        results = [False] * checks + [True] * 1000
+        patcher = patch.object(deadline, "expired", side_effect=results)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return deadline
+
+    def assert_partial(self, layout, num_items, partial):
+        with self.assertRaises(LayoutTimeout) as e:
+            layout.add_many([Circle(radius=2) for x in range(0, num_items)])
+        self.assertEquals(len(e.exception.items), partial)
+
+        index = GridLayout(Container(width=100, height=100))
+        index.items = [Circle(radius=r, x=x, y=y) for x, y, r in e.exception.items]
+        self.assertFalse(index.items_intersect())
+
+    def test_pixels_engine(self):
+        layout = RandomLayout(2, Container(width=100, height=100), deadline=self.expire_after(100))
+        # 96 columns of candidates checked before the placement loop
+        self.assert_partial(layout, 10, 4)
+
+    @skipIf(not numpy, "numpy not installed")
+    def test_bitmap_engine(self):
+        layout = RandomLayout(2, Container(width=100, height=100), engine="bitmap",
+                              deadline=self.expire_after(3))
+        self.assert_partial(layout, 10, 3)
+
+    def test_poisson_engine(self):
+        layout = RandomLayout(2, Container(width=100, height=100), engine="poisson",
+                              deadline=self.expire_after(0))
+        self.assert_partial(layout, 100, 1)
+
+    def test_poisson_engine_sparse(self):
+        layout = RandomLayout(2, Container(width=100, height=100), engine="poisson", seed=1,
+                              deadline=self.expire_after(3))
+        self.assert_partial(layout, 10, 3)
+
+    def test_expired_after_placement(self):
+        deadline = Deadline()
+        layout = RandomLayout(2, Container(width=100, height=100), engine="poisson", seed=1,
+                              deadline=deadline)
+        item_coordinates = layout.item_coordinates
+
+        def place(num_items):
+            coords = item_coordinates(num_items)
+            deadline.cancel()
+            return coords
+
+        # finished coordinates aren't thrown away
+        with patch.object(layout, "item_coordinates", side_effect=place):
+            self.assert_partial(layout, 10, 10)
+
+    def test_incremental(self):
+        layout = RandomLayout(2, Container(width=100, height=100), incremental=True,
+                              deadline=self.expire_after(98))
+        layout.add(Circle(radius=2))
+        self.assert_partial(layout, 5, 2)
+        self.assertEquals(len(layout.items), 1)
+
+    def test_partial_items_built_only_on_expiry(self):
+        layout = RandomLayout(2, Container(width=100, height=100), deadline=Deadline(60))
+        with patch.object(layout, "placed_items") as placed_items:
+            layout.add_many([Circle(radius=2) for x in range(0, 10)])
+        self.assertFalse(placed_items.called)
+
+    def test_deterministic_layout(self):
+        layout = GridLayout(Container(width=100, height=100), deadline=Deadline(0))
+        with self.assertRaises(LayoutTimeout):
+            layout.add_many([Circle(radius=2) for x in range(0, 10)])
+
+    def test_layout_function(self):
+        with self.assertRaises(LayoutTimeout):
+            layouts.random_layout(100, 100, 10, radius=2, deadline=Deadline(0))
+
+
+class LayoutTaskTests(TestCase):
+    def test_result(self):
+        task = LayoutTask(layouts.random_layout, 100, 100, 10, radius=2, seed=1)
+        self.assertEquals(task.result(5), layouts.random_layout(100, 100, 10, radius=2, seed=1))
+        self.assertTrue(task.done())
+
+    def test_cancel(self):
+        # placing all candidate positions of a big container takes long
+        task = LayoutTask(layouts.random_layout, 3000, 3000, 10, radius=2)
+        with self.assertRaises(TimeoutError):
+            task.result(0.01)
+
+        started = time.time()
+        task.cancel()
+        with self.assertRaises(LayoutTimeout) as e:
+            task.result(5)
+        self.assertEquals(e.exception.message, "layout cancelled")
+        self.assertLess(time.time() - started, 1)
+
+    def test_timeout(self):
+        task = LayoutTask(layouts.random_layout, 3000, 3000, 10, radius=2, timeout=0.05)
+        with self.assertRaises(LayoutTimeout):
+            task.result(5)
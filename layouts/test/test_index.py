@@ -0,0 +1,39 @@
+import random
+
+from unittest import TestCase
+from itertools import combinations
+
+from ..primitives import Circle
+from ..index import SpatialHash
+
+
+class SpatialHashTests(TestCase):
+    def test_cell_size(self):
+        index = SpatialHash.for_boxes([(0, 0, 2, 2), (5, 5, 9, 9)])
+        self.assertEquals(index.cell_size, 5)
+        self.assertEquals(SpatialHash.for_boxes([]).cell_size, 1)
+
+    def test_add(self):
+        index = SpatialHash(3)
+        self.assertTrue(index.add((1, 0, 3, 2)))
+        self.assertTrue(index.add((4, 0, 6, 2)))
+        # touching boxes intersect
+        self.assertFalse(index.add((3, 2, 5, 4)))
+        self.assertTrue(index.add((0, 3, 2, 5)))
+
+    def test_negative_coordinates(self):
+        index = SpatialHash(3)
+        self.assertTrue(index.add((-2, -2, 0, 0)))
+        self.assertTrue(index.intersects((-1, -1, 1, 1)))
+        self.assertFalse(index.intersects((1, 1, 3, 3)))
+
+    def test_matches_pairwise_check(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            items = [Circle(radius=rng.randint(1, 4), x=rng.randint(0, 60), y=rng.randint(0, 60))
+                     for _ in range(8)]
+            expected = any(a.intersects_with(b) for a, b in combinations(items, 2))
+
+            boxes = [item.box_coordinates() for item in items]
+            index = SpatialHash.for_boxes(boxes)
+            self.assertEquals(not all(index.add(box) for box in boxes), expected)
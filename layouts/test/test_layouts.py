@@ -1,10 +1,12 @@
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
 from mock import patch
 
 from ..primitives import Container, Circle
-from ..layouts import HorizontalLineLayout, GridLayout, CircleLayout, RandomLayout
+from ..layouts import HorizontalLineLayout, GridLayout, CircleLayout, RandomLayout, new_layout, optimal_radius
+from .. import horizontal_line_layout, grid_layout
 from ..errors import LayoutError
+from ..compat import numpy
 
 
 class TestHorizontalLineLayout(TestCase):
@@ -78,6 +80,51 @@ class TestHorizontalLineLayout(TestCase):
         with self.assertRaises(LayoutError):
             layout.add(Circle(radius=2))
 
+    def test_add_many(self):
+        layout = HorizontalLineLayout(Container(height=3, width=6))
+        layout.add_many([Circle(radius=1), Circle(radius=1)])
+        self.assertEquals(layout.as_tuples(), [(1, 1, 1), (4, 1, 1)])
+
+        with self.assertRaises(LayoutError):
+            layout.add_many([Circle(radius=1)])
+
+    def test_add_many_same_as_add(self):
+        container = Container(height=20, width=100)
+        l1 = HorizontalLineLayout(container)
+        l2 = HorizontalLineLayout(container)
+        for x in range(0, 5):
+            l1.add(Circle(radius=5))
+        l2.add_many([Circle(radius=5) for x in range(0, 5)])
+        self.assertEquals(l1.as_tuples(), l2.as_tuples())
+
+    def test_add_many_no_items(self):
+        layout = HorizontalLineLayout(Container(height=3, width=6))
+        layout.add_many([])
+        self.assertEquals(layout.as_tuples(), [])
+
+    def test_iter_items_same_as_add_many(self):
+        for width, height, num_items, radius in [(6, 3, 2, 1), (100, 20, 5, 5), (100, 20, 6, 10),
+                                                 (100, 20, 10, 5), (100, 20, 11, 5), (100, 21, 3, 10),
+                                                 (7, 5, 3, 1), (8, 3, 4, 1), (3, 3, 0, 1)]:
+            container = Container(width=width, height=height)
+            l1 = HorizontalLineLayout(container)
+            try:
+                expected = l1.iter_items(num_items, radius)
+            except LayoutError as e:
+                expected = e.message
+
+            l2 = HorizontalLineLayout(container)
+            try:
+                l2.add_many([Circle(radius=radius) for x in range(0, num_items)])
+                result = l2.as_tuples()
+            except LayoutError as e:
+                result = e.message
+
+            if isinstance(expected, str):
+                self.assertEquals(result, expected)
+            else:
+                self.assertEquals(list(expected), result)
+
     def test_arrange(self):
         layout = HorizontalLineLayout(Container(height=7, width=7))
         layout.items.append(Circle(radius=1))
@@ -98,17 +145,73 @@ class GridLayoutTests(TestCase):
     def test_item_coordinates(self):
         layout = GridLayout(Container(width=7, height=7))
         self.assertEquals(layout.item_coordinates(1), [(3, 3)])
-        self.assertEquals(layout.item_coordinates(2), [(2, 2), (2, 5), (5, 2), (5, 5)])
-        self.assertEquals(layout.item_coordinates(3), [(2, 2), (2, 5), (5, 2), (5, 5)])
+        self.assertEquals(layout.item_coordinates(2), [(3, 2), (3, 5)])
+        self.assertEquals(layout.item_coordinates(3), [(2, 2), (2, 5), (5, 2)])
         self.assertEquals(layout.item_coordinates(4), [(2, 2), (2, 5), (5, 2), (5, 5)])
-        self.assertEquals(layout.item_coordinates(5), [(2, 2), (2, 5), (5, 2), (5, 5)])
-            
+        self.assertEquals(layout.item_coordinates(5), [(2, 1), (2, 3), (2, 5), (4, 1), (4, 3)])
+        with self.assertRaises(LayoutError):
+            layout.item_coordinates(26)
+
+    def test_grid_size(self):
+        layout = GridLayout(Container(width=100, height=50))
+        self.assertEquals(layout.grid_size(1), (1, 100, 50))
+        self.assertEquals(layout.grid_size(5), (3, 33, 16))
+        self.assertEquals(layout.grid_size(9), (3, 33, 16))
+        with self.assertRaises(LayoutError) as e:
+            layout.grid_size(2500)
+        self.assertEquals(e.exception.message, "couldn't place all items in the container")
+
+    def test_large_grid(self):
+        layout = GridLayout(Container(width=20000, height=20000))
+        coords = layout.item_coordinates(10000)
+        self.assertEquals(len(coords), 10000)
+        self.assertEquals(coords[0], (100, 100))
+        self.assertEquals(coords[-1], (19900, 19900))
+
+        items = grid_layout(10000, 10000, 10000, radius=1)
+        self.assertEquals(len(items), 10000)
+
+    def test_centered(self):
+        xs = [x for x, y in GridLayout(Container(width=1000, height=1000)).item_coordinates(900)]
+        self.assertEquals((min(xs), max(xs)), (21, 978))
+
+    def test_partial_grid_centered(self):
+        # only the columns in use are centered
+        self.assertEquals(GridLayout(Container(width=100, height=100)).item_coordinates(2), [(50, 25), (50, 75)])
+        self.assertEquals(grid_layout(37, 91, 2, radius=10), [(18, 23, 10), (18, 68, 10)])
+
+    def test_iter_items_same_as_add_many(self):
+        for width, height, num_items, radius in [(7, 7, 1, 2), (7, 7, 2, 2), (7, 7, 4, 1), (100, 100, 3, 10),
+                                                 (100, 50, 7, 5), (100, 50, 7, 6), (30, 30, 50, 1),
+                                                 (100, 100, 81, 4), (100, 100, 81, 5), (100, 12, 2, 5)]:
+            container = Container(width=width, height=height)
+            try:
+                expected = list(GridLayout(container).iter_items(num_items, radius))
+            except LayoutError as e:
+                expected = e.message
+
+            layout = GridLayout(container)
+            try:
+                layout.add_many([Circle(radius=radius) for x in range(0, num_items)])
+                result = layout.as_tuples()
+            except LayoutError as e:
+                result = e.message
+
+            self.assertEquals(expected, result)
+
     def test_grid_layout_add_items_overlap(self):
         layout = GridLayout(Container(width=7, height=7))
         layout.add(Circle(radius=2))
         with self.assertRaises(LayoutError):
             layout.add(Circle(radius=1))
 
+    def test_add_many_cells_too_small(self):
+        # 100 items of radius 1 fill the whole container
+        GridLayout(Container(width=30, height=30)).add_many([Circle(radius=1) for x in range(0, 100)])
+        with self.assertRaises(LayoutError) as e:
+            GridLayout(Container(width=30, height=30)).add_many([Circle(radius=2) for x in range(0, 50)])
+        self.assertEquals(e.exception.message, "overlapping items")
+
     def test_contiiner_not_big_enough(self):
         layout = GridLayout(Container(width=3, height=3))
         layout.add(Circle(radius=1))
@@ -150,6 +253,62 @@ class CircleLayoutTests(TestCase):
         with self.assertRaises(LayoutError):
             layout.add(Circle(radius=1))
 
+    def test_single_ring(self):
+        layout = CircleLayout(Container(width=200, height=200))
+        self.assertEquals(layout.item_coordinates(8, 5), layout.ring_coordinates(50, 8))
+
+    def test_rings(self):
+        layout = CircleLayout(Container(width=200, height=200))
+        self.assertEquals(layout.rings(2), [50, 58, 66, 74, 82, 90, 42, 34, 26, 18, 10, 2])
+
+        for compact in (False, True):
+            layout = CircleLayout(Container(width=200, height=200), compact=compact)
+            layout.add_many([Circle(radius=2) for x in range(0, 400)])
+            self.assertEquals(len(layout.items), 400)
+            self.assertFalse(layout.items_intersect())
+            for item in layout.items:
+                self.assertTrue(layout.container.within_bounds(item))
+
+    def test_ring_capacity(self):
+        layout = CircleLayout(Container(width=200, height=200))
+        self.assertEquals(layout.ring_capacity(50, 2), 44)
+        self.assertEquals(layout.ring_capacity(2, 2), 1)
+        # ring doesn't fit in the container
+        self.assertEquals(layout.ring_capacity(98, 2), 0)
+
+    def test_not_enough_rings(self):
+        layout = CircleLayout(Container(width=50, height=50))
+        with self.assertRaises(LayoutError) as e:
+            layout.add_many([Circle(radius=5) for x in range(0, 30)])
+        self.assertEquals(e.exception.message, "couldn't place all items in the container")
+
+
+class SpacingCertificationTests(TestCase):
+    def test_certified(self):
+        container = Container(width=100, height=100)
+        for layout in (HorizontalLineLayout(container), GridLayout(container), CircleLayout(container)):
+            layout.add_many([Circle(radius=2) for x in range(0, 9)])
+            with patch.object(layout, "items_intersect") as items_intersect:
+                layout.add(Circle(radius=2))
+            self.assertFalse(items_intersect.called)
+
+    def test_not_certified(self):
+        # 2 items in a line 7px apart certainly don't overlap with radius 3
+        layout = HorizontalLineLayout(Container(width=14, height=7))
+        layout.add(Circle(radius=3))
+        layout.add(Circle(radius=2))
+        self.assertTrue(layout.spacing_certified())
+
+        layout = GridLayout(Container(width=100, height=100))
+        layout.add_many([Circle(radius=2) for x in range(0, 3)])
+        layout.items.append(Circle(radius=25))
+        self.assertFalse(layout.spacing_certified())
+
+        layout = RandomLayout(1, Container(width=6, height=3))
+        with patch.object(layout, "items_intersect", return_value=False) as items_intersect:
+            layout.add(Circle(radius=1))
+        self.assertTrue(items_intersect.called)
+
 
 class RandomLayoutTests(TestCase):
     def test_center_coords(self):
@@ -195,7 +354,7 @@ class RandomLayoutTests(TestCase):
 
         radius = 1
         l1 = RandomLayout(radius, Container(width=6, height=3))
-        with patch("random.choice", side_effect=random_choice_mock_x):
+        with patch.object(l1.rng, "choice", side_effect=random_choice_mock_x):
             self.assertEquals(l1.item_coordinates(1), [(1, 1)])
             self.assertEquals(l1.item_coordinates(2), [(1, 1), (4, 1)])
             with self.assertRaises(LayoutError) as e:
@@ -203,7 +362,7 @@ class RandomLayoutTests(TestCase):
             self.assertEquals(e.exception.message, "couldn't place all items in the container")
 
         l2 = RandomLayout(radius, Container(width=3, height=6))
-        with patch("random.choice", side_effect=random_choice_mock_y):
+        with patch.object(l2.rng, "choice", side_effect=random_choice_mock_y):
             self.assertEquals(l2.item_coordinates(1), [(1, 1)])
             self.assertEquals(l2.item_coordinates(2), [(1, 1), (1, 4)])
             with self.assertRaises(LayoutError) as e:
@@ -228,9 +387,231 @@ class RandomLayoutTests(TestCase):
 
         radius = 1
         l1 = RandomLayout(radius, Container(width=6, height=3))
-        with patch("random.choice", side_effect=random_choice_mock_x):
+        with patch.object(l1.rng, "choice", side_effect=random_choice_mock_x):
             # item placed in a way that there's no more space for the 2nd item
             l1.add(Circle(radius=1))
             with self.assertRaises(LayoutError) as e:
                 l1.add(Circle(radius=1))
             self.assertEquals(e.exception.message, "couldn't place all items in the container")
+
+    def test_invalid_engine(self):
+        with self.assertRaises(AssertionError):
+            RandomLayout(1, Container(width=3, height=3), engine="unknown")
+
+    def test_poisson_engine(self):
+        layout = RandomLayout(5, Container(width=200, height=100), engine="poisson")
+        layout.add_many([Circle(radius=5) for x in range(0, 40)])
+        self.assertEquals(len(layout.as_tuples()), 40)
+        self.assertFalse(layout.items_intersect())
+        for item in layout.items:
+            self.assertTrue(layout.container.within_bounds(item))
+
+    def test_poisson_engine_sparse(self):
+        # few items in a large container don't sample the whole container
+        layout = RandomLayout(1, Container(width=2000, height=2000), engine="poisson")
+        with patch("layouts.layouts.poisson_disk_sample", side_effect=AssertionError("container sampled")):
+            layout.add_many([Circle(radius=1) for x in range(0, 10)])
+        self.assertEquals(len(layout.as_tuples()), 10)
+        self.assertFalse(layout.items_intersect())
+        for item in layout.items:
+            self.assertTrue(layout.container.within_bounds(item))
+
+    def test_poisson_engine_no_space(self):
+        layout = RandomLayout(2, Container(width=9, height=5), engine="poisson")
+        with self.assertRaises(LayoutError) as e:
+            layout.add_many([Circle(radius=2), Circle(radius=2)])
+        self.assertEquals(e.exception.message, "couldn't place all items in the container")
+
+    @skipIf(not numpy, "numpy not installed")
+    def test_bitmap_engine(self):
+        layout = RandomLayout(3, Container(width=100, height=60), engine="bitmap")
+        layout.add_many([Circle(radius=3) for x in range(0, 30)])
+        self.assertEquals(len(layout.as_tuples()), 30)
+        self.assertFalse(layout.items_intersect())
+        for item in layout.items:
+            self.assertTrue(layout.container.within_bounds(item))
+
+    def test_bitmap_engine_without_numpy(self):
+        with patch("layouts.layouts.numpy", None):
+            layout = RandomLayout(1, Container(width=3, height=3), engine="bitmap")
+        self.assertEquals(layout.engine, "pixels")
+
+
+class IncrementalRandomLayoutTests(TestCase):
+    def add_one_by_one(self, engine, compact=False):
+        layout = RandomLayout(3, Container(width=100, height=60), engine=engine,
+                              incremental=True, compact=compact)
+        placed = []
+        for i in range(0, 20):
+            layout.add(Circle(radius=3))
+            # earlier items stay where they are
+            self.assertEquals(layout.as_tuples()[:len(placed)], placed)
+            placed = layout.as_tuples()
+
+        self.assertEquals(len(placed), 20)
+        self.assertFalse(layout.items_intersect())
+        for x, y, r in placed:
+            self.assertTrue(layout.container.within_bounds(Circle(radius=r, x=x, y=y)))
+
+    def test_pixels_engine(self):
+        self.add_one_by_one("pixels")
+        self.add_one_by_one("pixels", compact=True)
+
+    def test_poisson_engine(self):
+        self.add_one_by_one("poisson")
+
+    @skipIf(not numpy, "numpy not installed")
+    def test_bitmap_engine(self):
+        self.add_one_by_one("bitmap")
+
+    def test_free_state_kept(self):
+        layout = RandomLayout(1, Container(width=30, height=30), incremental=True)
+        layout.add(Circle(radius=1))
+        free = layout.free
+        layout.add(Circle(radius=1))
+        self.assertIs(layout.free, free)
+
+    def test_no_space(self):
+        layout = RandomLayout(1, Container(width=6, height=3), incremental=True)
+        with patch.object(layout.rng, "randint", side_effect=lambda a, b: (a + b + 1) / 2):
+            layout.add(Circle(radius=1))
+        self.assertEquals(layout.as_tuples(), [(3, 1, 1)])
+
+        with self.assertRaises(LayoutError) as e:
+            layout.add(Circle(radius=1))
+        self.assertEquals(e.exception.message, "couldn't place all items in the container")
+        self.assertEquals(len(layout.items), 1)
+
+        # free positions are rebuilt from the items in the layout
+        self.assertIsNone(layout.free)
+        self.assertEquals(layout.free_centers(), set())
+
+
+    def test_check_without_coordinates(self):
+        layout = CircleLayout(Container(width=1000, height=1000))
+        with patch.object(layout, "ring_coordinates") as ring_coordinates:
+            # impossible and certainly possible requests
+            with self.assertRaises(LayoutError) as e:
+                layout.check(100000, 3)
+            self.assertEquals(e.exception.message, "couldn't place all items in the container")
+            layout.check(layout.rings_capacity(3), 3)
+        self.assertFalse(ring_coordinates.called)
+
+
+class FeasibilityTests(TestCase):
+    def arranged(self, layout, num_items, radius):
+        try:
+            layout.add_many([Circle(radius=radius) for x in range(0, num_items)])
+        except LayoutError:
+            return False
+        return True
+
+    def test_check_same_as_add_many(self):
+        container = Container(width=57, height=31)
+        for cls in (HorizontalLineLayout, GridLayout, CircleLayout):
+            for radius in (1, 2, 5):
+                for num_items in range(0, 40):
+                    expected = self.arranged(cls(container), num_items, radius)
+                    self.assertEquals(cls(container).feasible(num_items, radius), expected)
+
+    def test_check_doesnt_place_items(self):
+        layout = GridLayout(Container(width=100, height=100))
+        with self.assertRaises(LayoutError):
+            layout.check(100, 5)
+        self.assertEquals(layout.items, [])
+
+    def test_max_items(self):
+        container = Container(width=100, height=40)
+        for cls in (HorizontalLineLayout, GridLayout, CircleLayout):
+            for radius in (1, 3, 8):
+                layout = cls(container)
+                max_items = layout.max_items(radius)
+                self.assertTrue(self.arranged(cls(container), max_items, radius))
+                for num_items in range(max_items + 1, container.capacity(3) + 1):
+                    self.assertFalse(layout.feasible(num_items, radius))
+
+    def test_max_items_grid(self):
+        # 33 cells of 3px in each direction
+        layout = GridLayout(Container(width=100, height=100))
+        self.assertEquals(layout.max_items(1), 1089)
+        self.assertTrue(all(layout.feasible(num_items, 1) for num_items in range(1, 1090)))
+
+        self.assertEquals(GridLayout(Container(width=1000, height=1000)).max_items(1), 110889)
+        # 2 items in a single column
+        self.assertEquals(GridLayout(Container(width=5, height=100)).max_items(1), 2)
+
+    def test_max_items_random(self):
+        layout = RandomLayout(1, Container(width=6, height=3))
+        self.assertEquals(layout.max_items(1), 2)
+
+        # capacity allows 3 items, but circles of radius 2 don't fit at all
+        layout = RandomLayout(2, Container(width=9, height=3))
+        self.assertEquals(layout.max_items(2), 0)
+        with self.assertRaises(LayoutError) as e:
+            layout.check(1, 2)
+        self.assertEquals(e.exception.message, "couldn't place all items in the container")
+
+
+class OptimalRadiusTests(TestCase):
+    def test_largest_feasible_radius(self):
+        for kind in ("horizontal_line", "grid", "circle", "random"):
+            for width, height in [(100, 100), (57, 31), (200, 40)]:
+                for num_items in (1, 2, 5, 13, 40):
+                    radius = optimal_radius(kind, width, height, num_items)
+                    layout = new_layout(kind, Container(width, height), 1)
+                    if radius > 0:
+                        self.assertTrue(layout.feasible(num_items, radius))
+                    self.assertFalse(layout.feasible(num_items, radius + 1))
+
+    def test_items_fit(self):
+        radius = optimal_radius("horizontal_line", 100, 20, 5)
+        self.assertEquals(radius, 9)
+        self.assertEquals(horizontal_line_layout(100, 20, 5, radius=radius)[0], (10, 9, 9))
+
+        radius = optimal_radius("grid", 100, 100, 3)
+        layout = GridLayout(Container(width=100, height=100))
+        layout.add_many([Circle(radius=radius) for x in range(0, 3)])
+        with self.assertRaises(LayoutError):
+            GridLayout(Container(width=100, height=100)).add_many([Circle(radius=radius + 1) for x in range(0, 3)])
+
+    def test_no_radius_fits(self):
+        self.assertEquals(optimal_radius("horizontal_line", 3, 3, 2), 0)
+        self.assertEquals(optimal_radius("random", 10, 10, 100), 0)
+
+
+@skipIf(not numpy, "numpy not installed")
+class CoordinateArraysTests(TestCase):
+    def test_same_as_item_coordinates(self):
+        for cls in [HorizontalLineLayout, GridLayout, CircleLayout]:
+            for width, height in [(7, 7), (20, 20), (100, 20), (70, 50)]:
+                layout = cls(Container(width=width, height=height))
+                for num_items in range(1, 12):
+                    try:
+                        expected = layout.item_coordinates(num_items)
+                    except LayoutError:
+                        with self.assertRaises(LayoutError):
+                            layout.item_coordinate_arrays(num_items)
+                        continue
+
+                    xs, ys = layout.item_coordinate_arrays(num_items)
+                    self.assertEquals(zip(xs.tolist(), ys.tolist()), expected)
+
+    def test_random_layout_has_no_arrays(self):
+        layout = RandomLayout(1, Container(width=3, height=3))
+        self.assertEquals(layout.item_coordinate_arrays(1), None)
+
+    def test_add_many_without_numpy(self):
+        container = Container(width=70, height=50)
+        l1 = CircleLayout(container)
+        l1.add_many([Circle(radius=4) for x in range(0, 5)])
+        with patch("layouts.layouts.numpy", None):
+            l2 = CircleLayout(container)
+            l2.add_many([Circle(radius=4) for x in range(0, 5)])
+        self.assertEquals(l1.as_tuples(), l2.as_tuples())
+
+    def test_arrange_arrays_out_of_bounds(self):
+        layout = HorizontalLineLayout(Container(height=3, width=3))
+        layout.items.append(Circle(radius=1))
+        with self.assertRaises(LayoutError) as e:
+            layout.arrange_arrays(numpy.array([0]), numpy.array([1]))
+        self.assertEquals(e.exception.message, "item doesn't fit in the container")
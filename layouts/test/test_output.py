@@ -0,0 +1,79 @@
+import json
+
+from io import BytesIO
+from array import array
+from unittest import TestCase, skipIf
+
+from ..primitives import Container, Circle
+from ..layouts import GridLayout
+from ..storage import ItemArray
+from ..output import iter_write, write_columns, npy_header, FORMATS
+from ..compat import numpy
+
+
+class OutputTests(TestCase):
+    items = [(10, 20, 5), (30, 20, 5), (-1, 70000, 2)]
+
+    def write(self, format, items=None):
+        f = BytesIO()
+        items = self.items if items is None else items
+        passed = list(iter_write(iter(items), f, format, len(items)))
+        self.assertEquals(passed, items)
+        return f.getvalue()
+
+    def test_repr(self):
+        self.assertEquals(self.write("repr"), "[(10, 20, 5), (30, 20, 5), (-1, 70000, 2)]\n")
+        self.assertEquals(self.write("repr", []), "[]\n")
+
+    def test_binary(self):
+        data = self.write("binary")
+        self.assertEquals(len(data), 36)
+        self.assertEquals(data[:12], "\x0a\x00\x00\x00\x14\x00\x00\x00\x05\x00\x00\x00")
+        self.assertEquals(data[24:28], "\xff\xff\xff\xff")
+
+    def test_binary_chunks(self):
+        items = [(i, i + 1, 2) for i in range(0, 10000)]
+        values = array("i")
+        values.fromstring(self.write("binary", items))
+        self.assertEquals(zip(values[0::3], values[1::3], values[2::3]), items)
+
+    def test_csv(self):
+        self.assertEquals(self.write("csv"), "x,y,r\n10,20,5\n30,20,5\n-1,70000,2\n")
+
+    def test_ndjson(self):
+        lines = self.write("ndjson").splitlines()
+        self.assertEquals([tuple(json.loads(line)) for line in lines], self.items)
+
+    def test_npy_header(self):
+        header = npy_header(3)
+        self.assertEquals(len(header) % 64, 0)
+        self.assertTrue(header.startswith("\x93NUMPY\x01\x00"))
+        self.assertTrue(header.endswith("\n"))
+
+    def test_columns_same_as_rows(self):
+        storage = ItemArray(Circle(radius=r, x=x, y=y) for x, y, r in self.items)
+        for format in FORMATS:
+            if format == "npy":
+                continue  # columns are written in column-major order
+            f = BytesIO()
+            write_columns(storage, f, format)
+            self.assertEquals(f.getvalue(), self.write(format))
+
+    @skipIf(not numpy, "numpy not installed")
+    def test_npy(self):
+        expected = numpy.array(self.items, dtype=numpy.int32)
+        self.assertTrue((numpy.load(BytesIO(self.write("npy"))) == expected).all())
+
+        storage = ItemArray(Circle(radius=r, x=x, y=y) for x, y, r in self.items)
+        f = BytesIO()
+        write_columns(storage, f, "npy")
+        f.seek(0)
+        self.assertTrue((numpy.load(f) == expected).all())
+
+    def test_layout_write(self):
+        for compact in (False, True):
+            layout = GridLayout(Container(width=100, height=100), compact=compact)
+            layout.add_many([Circle(radius=10) for x in range(0, 3)])
+            f = BytesIO()
+            layout.write(f, "csv")
+            self.assertEquals(f.getvalue(), "x,y,r\n25,25,10\n25,75,10\n75,25,10\n")
@@ -0,0 +1,87 @@
+import random
+
+from multiprocessing import Pool
+from unittest import TestCase
+
+from ..primitives import Container, Circle
+from ..layouts import RandomLayout
+from ..deadline import Deadline
+from ..errors import LayoutTimeout
+from ..parallel import strips, sample_strip, resolve_conflicts, parallel_sample
+
+
+class ParallelTests(TestCase):
+    def assert_valid(self, points, width, height, radius):
+        container = Container(width, height)
+        for x, y in points:
+            self.assertTrue(container.within_bounds(Circle(radius=radius, x=x, y=y)))
+
+        layout = RandomLayout(radius, container)
+        layout.items = [Circle(radius=radius, x=x, y=y) for x, y in points]
+        self.assertFalse(layout.items_intersect())
+
+    def test_strips(self):
+        self.assertEquals(strips(100, 2, 4), [(0, 25), (25, 50), (50, 75), (75, 100)])
+        # strips are at least 4 items wide
+        self.assertEquals(strips(100, 2, 10), [(0, 20), (20, 40), (40, 60), (60, 80), (80, 100)])
+        self.assertEquals(strips(10, 2, 4), [(0, 10)])
+        # number of strips is limited by the container only
+        self.assertEquals(len(strips(10000, 2)), 16)
+
+    def test_sample_strip(self):
+        points = sample_strip((25, 50, 100, 60, 2, 1, None))
+        self.assertTrue(points)
+        for x, y in points:
+            self.assertTrue(25 <= x < 50)
+            self.assertTrue(2 <= y < 58)
+
+        for x, y in sample_strip((0, 25, 100, 60, 2, 1, None)):
+            self.assertTrue(2 <= x < 25)
+
+    def test_resolve_conflicts(self):
+        points, index = resolve_conflicts([[(10, 10)], [(13, 12), (20, 10)]], 2)
+        self.assertEquals(points, [(10, 10), (20, 10)])
+
+    def test_parallel_sample(self):
+        points = parallel_sample(200, 100, 3, random.Random(1), workers=3)
+        self.assert_valid(points, 200, 100, 3)
+        # about as dense as a sample of the whole container
+        self.assertGreater(len(points), 200)
+
+    def test_reproducible(self):
+        self.assertEquals(parallel_sample(200, 100, 3, random.Random(1), workers=3),
+                          parallel_sample(200, 100, 3, random.Random(1), workers=3))
+
+    def test_independent_of_workers(self):
+        self.assertEquals(parallel_sample(200, 100, 3, random.Random(1), workers=1),
+                          parallel_sample(200, 100, 3, random.Random(1), workers=3))
+
+    def test_daemonic_process(self):
+        # workers of a pool can't start a pool of their own
+        pool = Pool(1)
+        try:
+            points = pool.apply(parallel_sample, (200, 100, 3, random.Random(1), 2))
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEquals(points, parallel_sample(200, 100, 3, random.Random(1), workers=2))
+
+    def test_deadline(self):
+        deadline = Deadline()
+        deadline.cancel()
+        # every strip stops after its first point
+        points = parallel_sample(200, 100, 3, random.Random(1), deadline=deadline)
+        self.assertLessEqual(len(points), len(strips(200, 3)))
+
+        layout = RandomLayout(3, Container(width=200, height=100), engine="parallel", deadline=deadline)
+        with self.assertRaises(LayoutTimeout):
+            layout.add_many([Circle(radius=3) for x in range(0, 100)])
+
+    def test_container_too_small(self):
+        self.assertEquals(parallel_sample(4, 100, 2, workers=2), [])
+
+    def test_parallel_engine(self):
+        layout = RandomLayout(3, Container(width=200, height=100), engine="parallel", workers=2)
+        layout.add_many([Circle(radius=3) for x in range(0, 100)])
+        self.assertEquals(len(layout.items), 100)
+        self.assert_valid([(item.x, item.y) for item in layout.items], 200, 100, 3)
@@ -1,7 +1,8 @@
-from unittest import TestCase
+from unittest import TestCase, skipIf
 from itertools import combinations
 
 from ..primitives import Container, Circle
+from ..compat import numpy
 
 
 class ContainerTests(TestCase):
@@ -31,11 +32,31 @@ class ContainerTests(TestCase):
         c4 = Container(width=7, height=7)
         self.assertEquals(c4.capacity(3), 4)
 
+    def test_max_items(self):
+        c = Container(width=20, height=20)
+        self.assertEquals(c.max_items("horizontal_line", 1), 6)
+        self.assertEquals(c.max_items("grid", 1), 36)
+        self.assertEquals(c.max_items("random", 1), 36)
+        self.assertEquals(c.max_items("random", 20), 0)
+
+    def test_max_items_layout_class(self):
+        from ..layouts import GridLayout
+
+        c = Container(width=20, height=20)
+        self.assertEquals(c.max_items(GridLayout, 1), c.max_items("grid", 1))
+
     def test_within_bounds(self):
         c = Container(width=3, height=3)
         self.assertTrue(c.within_bounds(Circle(radius=1, x=1, y=1)))
         self.assertFalse(c.within_bounds(Circle(radius=2, x=1, y=1)))
 
+    @skipIf(not numpy, "numpy not installed")
+    def test_within_bounds_all(self):
+        c = Container(width=6, height=3)
+        radii = numpy.array([1, 1])
+        self.assertTrue(c.within_bounds_all(numpy.array([1, 4]), numpy.array([1, 1]), radii))
+        self.assertFalse(c.within_bounds_all(numpy.array([1, 5]), numpy.array([1, 1]), radii))
+
 
 class CircleTests(TestCase):
     def test_default_coordinates(self):
@@ -0,0 +1,104 @@
+import os
+import random
+
+from io import BytesIO
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from PIL import Image
+
+from ..raster import write_tiled, write_tiled_file, fill_span, isqrt
+from ..render import bitmap
+
+
+# Pillow versions round edges of disks slightly differently, this
+# fraction of lit pixels may differ from its rendering
+MAX_DIFFERENCE = 0.02
+
+
+def lit_pixels(img):
+    width, height = img.size
+    return set((x, y) for x in range(0, width) for y in range(0, height) if img.getpixel((x, y)))
+
+
+class RasterTests(TestCase):
+    items = [(5, 5, 4), (20, 12, 6), (12, 27, 2), (27, 3, 1)]
+    width, height = 30, 30
+
+    def assert_image(self, img, items=None):
+        """
+        Checks that img looks the same as the image of items rendered by
+        Pillow.
+        """
+        items = items or self.items
+        self.assertEquals(img.size, (self.width, self.height))
+        expected = lit_pixels(bitmap(items, self.width, self.height))
+        pixels = lit_pixels(img)
+        self.assertLessEqual(len(pixels ^ expected), len(expected) * MAX_DIFFERENCE)
+
+    def test_bmp(self):
+        sink = BytesIO()
+        write_tiled(self.items, self.width, self.height, sink, "bmp")
+        sink.seek(0)
+        img = Image.open(sink)
+        self.assertEquals(img.format, "BMP")
+        self.assert_image(img.convert("L"))
+
+    def test_pbm(self):
+        sink = BytesIO()
+        write_tiled(self.items, self.width, self.height, sink, "pbm")
+        self.assertTrue(sink.getvalue().startswith("P4\n30 30\n"))
+        sink.seek(0)
+        self.assert_image(Image.open(sink).convert("L"))
+
+    def test_same_as_bitmap(self):
+        rng = random.Random(1)
+        self.width, self.height = 400, 300
+        items = [(rng.randint(0, 399), rng.randint(0, 299), rng.randint(1, 12)) for i in range(0, 200)]
+
+        for format in ["bmp", "pbm"]:
+            sink = BytesIO()
+            write_tiled(items, self.width, self.height, sink, format)
+            sink.seek(0)
+            self.assert_image(Image.open(sink).convert("L"), items)
+
+    def test_small_disks(self):
+        # 3x3 square and the smallest rounded disk
+        sink = BytesIO()
+        write_tiled([(2, 2, 1), (8, 3, 2)], 12, 6, sink, "pbm")
+        sink.seek(0)
+        self.assertEquals(lit_pixels(Image.open(sink).convert("L")),
+                          set([(x, y) for x in range(1, 4) for y in range(1, 4)] +
+                              [(x, y) for x in range(6, 11) for y in range(2, 5)] +
+                              [(x, y) for x in range(7, 10) for y in (1, 5)]))
+
+    def test_tile_size_doesnt_matter(self):
+        for format in ["bmp", "pbm"]:
+            whole = BytesIO()
+            write_tiled(self.items, self.width, self.height, whole, format, tile_rows=self.height)
+            for tile_rows in [1, 3, 7]:
+                tiles = BytesIO()
+                write_tiled(self.items, self.width, self.height, tiles, format, tile_rows=tile_rows)
+                self.assertEquals(tiles.getvalue(), whole.getvalue())
+
+    def test_memory_mapped_file(self):
+        directory = mkdtemp()
+        try:
+            path = os.path.join(directory, "plot.bmp")
+            write_tiled_file(iter(self.items), self.width, self.height, path, "bmp", tile_rows=4)
+            self.assert_image(Image.open(path).convert("L"))
+        finally:
+            rmtree(directory)
+
+    def test_fill_span(self):
+        pixels = bytearray(3)
+        fill_span(pixels, 0, 2, 4)
+        self.assertEquals(pixels, bytearray([0x38, 0, 0]))
+
+        pixels = bytearray(3)
+        fill_span(pixels, 0, 6, 17)
+        self.assertEquals(pixels, bytearray([0x03, 0xff, 0xc0]))
+
+    def test_isqrt(self):
+        self.assertEquals([isqrt(n) for n in range(0, 10)], [0, 1, 1, 1, 2, 2, 2, 2, 2, 3])
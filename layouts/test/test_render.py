@@ -0,0 +1,58 @@
+from io import BytesIO
+from unittest import TestCase
+
+from PIL import Image
+
+from ..primitives import Container, Circle
+from ..layouts import HorizontalLineLayout
+from ..render import render, guess_format
+
+
+class RenderTests(TestCase):
+    items = [(1, 1, 1), (4, 1, 1)]
+
+    def test_no_sink(self):
+        self.assertEquals(render(self.items, 6, 3), None)
+
+    def test_guess_format(self):
+        self.assertEquals(guess_format("plot.PNG"), "png")
+        self.assertEquals(guess_format("plot.svg"), "svg")
+        self.assertEquals(guess_format("plot"), "bmp")
+        self.assertEquals(guess_format(BytesIO()), "bmp")
+
+    def test_bitmap_formats(self):
+        for format in ["bmp", "png"]:
+            sink = BytesIO()
+            render(self.items, 8, 3, sink, format)
+            sink.seek(0)
+            img = Image.open(sink)
+            self.assertEquals(img.format, format.upper())
+            self.assertEquals(img.size, (8, 3))
+            self.assertEquals(img.getpixel((1, 1)), 255)
+            self.assertEquals(img.getpixel((7, 1)), 0)
+
+    def test_tiled(self):
+        for format in ["bmp", "pbm"]:
+            sink = BytesIO()
+            render(self.items, 8, 3, sink, format, tiled=True)
+            sink.seek(0)
+            img = Image.open(sink).convert("L")
+            self.assertEquals(img.getpixel((1, 1)), 255)
+            self.assertEquals(img.getpixel((7, 1)), 0)
+
+        with self.assertRaises(AssertionError):
+            render(self.items, 8, 3, BytesIO(), "png", tiled=True)
+
+    def test_svg(self):
+        sink = BytesIO()
+        render(self.items, 6, 3, sink, "svg")
+        svg = sink.getvalue()
+        self.assertTrue(svg.startswith('<svg xmlns="http://www.w3.org/2000/svg" width="6" height="3">'))
+        self.assertIn('<circle cx="4" cy="1" r="1" fill="white"/>', svg)
+
+    def test_layout_save(self):
+        layout = HorizontalLineLayout(Container(width=6, height=3))
+        layout.add_many([Circle(radius=1), Circle(radius=1)])
+        sink = BytesIO()
+        layout.save(sink, "png")
+        self.assertTrue(sink.getvalue().startswith("\x89PNG"))
@@ -0,0 +1,77 @@
+import random
+
+from unittest import TestCase, skipIf
+
+from ..primitives import Container, Circle
+from ..index import SpatialHash
+from ..sampling import poisson_disk_sample, dart_throw_sample, OccupancyMask
+from ..compat import numpy
+
+
+class PoissonDiskSampleTests(TestCase):
+    def test_container_too_small(self):
+        self.assertEquals(poisson_disk_sample(3, 3, 2), [])
+
+    def test_single_position(self):
+        self.assertEquals(poisson_disk_sample(3, 3, 1), [(1, 1)])
+
+    def test_points_dont_overlap(self):
+        radius = 3
+        container = Container(width=150, height=80)
+        points = poisson_disk_sample(container.width, container.height, radius,
+                                     rng=random.Random(1))
+        self.assertTrue(len(points) > 50)
+
+        index = SpatialHash(radius * 2 + 1)
+        for x, y in points:
+            item = Circle(radius=radius, x=x, y=y)
+            self.assertTrue(container.within_bounds(item))
+            self.assertTrue(index.add(item.box_coordinates()))
+
+    def test_container_is_filled(self):
+        # 5px apart in both directions, at most 12 * 12 items fit
+        points = poisson_disk_sample(60, 60, 2, rng=random.Random(2))
+        self.assertTrue(len(points) > 70)
+
+
+class DartThrowSampleTests(TestCase):
+    def test_container_too_small(self):
+        self.assertEquals(dart_throw_sample(3, 3, 2, 1), [])
+
+    def test_points_dont_overlap(self):
+        radius = 3
+        container = Container(width=150, height=80)
+        points = dart_throw_sample(container.width, container.height, radius, 20, rng=random.Random(1))
+        self.assertEquals(len(points), 20)
+
+        index = SpatialHash(radius * 2 + 1)
+        for x, y in points:
+            item = Circle(radius=radius, x=x, y=y)
+            self.assertTrue(container.within_bounds(item))
+            self.assertTrue(index.add(item.box_coordinates()))
+
+    def test_gives_up(self):
+        # only one position is available
+        self.assertEquals(dart_throw_sample(3, 3, 1, 2), [(1, 1)])
+
+
+@skipIf(not numpy, "numpy not installed")
+class OccupancyMaskTests(TestCase):
+    def test_free_positions(self):
+        mask = OccupancyMask(6, 3, 1)
+        self.assertEquals(len(mask), 4)
+        self.assertEquals(sorted(zip(*mask.free.nonzero())), [(1, 1), (2, 1), (3, 1), (4, 1)])
+
+    def test_exclude(self):
+        mask = OccupancyMask(6, 3, 1)
+        mask.exclude((1, 1))
+        self.assertEquals(len(mask), 1)
+        self.assertEquals(mask.choice(), (4, 1))
+        mask.exclude((4, 1))
+        self.assertEquals(len(mask), 0)
+
+    def test_choice_scans_mask(self):
+        mask = OccupancyMask(200, 200, 1)
+        mask.free[:] = False
+        mask.free[150, 20] = True
+        self.assertEquals(mask.choice(random.Random(3)), (150, 20))
@@ -0,0 +1,114 @@
+import json
+import threading
+import urllib2
+
+from unittest import TestCase
+from mock import patch
+
+import layouts
+
+from server import LayoutServer
+
+
+class LayoutServerTests(TestCase):
+    def setUp(self):
+        layouts.cache.invalidate()
+        self.server = LayoutServer(("127.0.0.1", 0), workers=1, max_pending=1, max_queued=1, queue_timeout=5)
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.01, ))
+        thread.daemon = True
+        thread.start()
+
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def request(self, path, data=None):
+        """
+        Returns status and decoded JSON response of request to path,
+        POST with data if it's given.
+        """
+        body = data if data is None or isinstance(data, basestring) else json.dumps(data)
+        try:
+            response = urllib2.urlopen(urllib2.Request(self.url + path, body), timeout=10)
+        except urllib2.HTTPError as e:
+            response = e
+        return response.getcode(), json.loads(response.read())
+
+    def test_layout(self):
+        status, response = self.request("/layout", {"type": "grid", "width": 100, "height": 100,
+                                                    "num_items": 3, "radius": 10})
+        self.assertEquals(status, 200)
+        self.assertEquals(response, {"items": [[25, 25, 10], [25, 75, 10], [75, 25, 10]]})
+
+        status, response = self.request("/layout", {"type": "random", "width": 100, "height": 100,
+                                                    "num_items": 3, "radius": 5, "seed": 1})
+        self.assertEquals(status, 200)
+        self.assertEquals(response["items"],
+                          [list(item) for item in layouts.random_layout(100, 100, 3, radius=5, seed=1)])
+
+    def test_invalid_request(self):
+        for data in ("not json", {"type": "hexagon"}, {"type": "grid", "width": 0, "height": 10, "num_items": 1},
+                     {"type": "random", "width": 10, "height": 10, "num_items": 1, "engine": "bogus"}):
+            status, response = self.request("/layout", data)
+            self.assertEquals(status, 400)
+            self.assertTrue(response["error"].startswith("invalid request: "), response)
+
+    def test_layout_error(self):
+        status, response = self.request("/layout", {"type": "horizontal_line", "width": 20, "height": 20,
+                                                    "num_items": 3, "radius": 5})
+        self.assertEquals(status, 422)
+        self.assertEquals(response, {"error": "item doesn't fit in the container"})
+
+    def test_internal_error(self):
+        with patch.object(self.server, "run_job", side_effect=RuntimeError("broken")):
+            status, response = self.request("/layout", {"type": "grid", "width": 100, "height": 100,
+                                                        "num_items": 3})
+        self.assertEquals(status, 500)
+        self.assertEquals(response, {"error": "internal error: broken"})
+        self.assertEquals(self.request("/stats")[1]["errors"], 1)
+
+    def test_busy(self):
+        job = {"type": "grid", "width": 100, "height": 100, "num_items": 3}
+        self.server.queue.queue_timeout = 0.05
+        # the only slot is taken, the request waits in the queue
+        self.assertTrue(self.server.queue.acquire())
+        try:
+            status, response = self.request("/layout", job)
+        finally:
+            self.server.queue.release()
+        self.assertEquals(status, 503)
+        self.assertEquals(response, {"error": "server busy"})
+        self.assertEquals(self.request("/stats")[1]["rejected"], 1)
+
+    def test_queued(self):
+        job = {"type": "grid", "width": 100, "height": 100, "num_items": 3}
+        results = []
+        self.assertTrue(self.server.queue.acquire())
+        thread = threading.Thread(target=lambda: results.append(self.request("/layout", job)))
+        thread.start()
+        while not self.server.queue.queued:
+            thread.join(0.01)
+
+        # queue is full
+        self.assertEquals(self.request("/layout", job)[0], 503)
+
+        self.server.queue.release()
+        thread.join()
+        self.assertEquals(results[0][0], 200)
+
+    def test_stats(self):
+        self.request("/layout", {"type": "grid", "width": 100, "height": 100, "num_items": 3})
+        self.request("/layout", {"type": "grid", "width": 0})
+
+        status, response = self.request("/stats")
+        self.assertEquals(status, 200)
+        self.assertEquals(response["requests"], 2)
+        self.assertEquals(response["errors"], 1)
+        self.assertEquals(response["rejected"], 0)
+        self.assertEquals(response["in_flight"], 0)
+        self.assertEquals(response["queued"], 0)
+
+    def test_not_found(self):
+        self.assertEquals(self.request("/other")[0], 404)
+        self.assertEquals(self.request("/other", {})[0], 404)
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import subprocess
+
+from unittest import TestCase
+
+from ..compat import OptionalModule
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# importing layouts takes at most this many times as long as starting
+# the interpreter, importing numpy or Pillow alone takes longer
+IMPORT_TIME_BUDGET = 3
+
+# modules that take long to import and are only needed by some layouts
+HEAVY_MODULES = ("PIL", "numpy", "multiprocessing")
+
+PROBE = """
+import sys, time, json
+started = time.time()
+import %s
+print(json.dumps({"time": time.time() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+def probe_import(module):
+    """
+    Imports module in a new interpreter and returns import time and
+    loaded modules.
+    """
+    output = subprocess.check_output([sys.executable, "-c", PROBE % module], cwd=ROOT)
+    return json.loads(output)
+
+
+def startup_time():
+    """
+    Returns wall time of starting the interpreter and doing nothing.
+    """
+    started = time.time()
+    subprocess.check_call([sys.executable, "-c", "pass"], cwd=ROOT)
+    return time.time() - started
+
+
+class StartupTests(TestCase):
+    def assert_no_heavy_modules(self, modules, allowed=()):
+        for module in modules:
+            name = module.split(".")[0]
+            self.assertFalse(name in HEAVY_MODULES and name not in allowed, module)
+        self.assertNotIn("layouts.raster", modules)
+
+    def test_import_layouts(self):
+        self.assert_no_heavy_modules(probe_import("layouts")["modules"])
+
+    def test_import_main(self):
+        # main needs number of CPUs for its command line help
+        self.assert_no_heavy_modules(probe_import("main")["modules"], allowed=("multiprocessing", ))
+
+    def test_small_layout(self):
+        modules = probe_import("layouts; layouts.circle_layout(100, 100, 10, radius=2)")["modules"]
+        self.assert_no_heavy_modules(modules)
+
+    def test_import_time(self):
+        best = min(probe_import("layouts")["time"] for i in range(0, 5))
+        startup = min(startup_time() for i in range(0, 5))
+        self.assertLess(best, startup * IMPORT_TIME_BUDGET)
+
+    def test_no_render(self):
+        output = subprocess.check_output(
+            [sys.executable, "main.py", "--no-render", "-t", "grid", "100", "100", "3"], cwd=ROOT)
+        self.assertEquals(output, "[(25, 25, 10), (25, 75, 10), (75, 25, 10)]\n")
+
+
+class OptionalModuleTests(TestCase):
+    def test_installed(self):
+        module = OptionalModule("json")
+        self.assertTrue(module)
+        self.assertEquals(module.dumps([1]), "[1]")
+
+    def test_missing(self):
+        module = OptionalModule("no_such_module")
+        self.assertFalse(module)
+        with self.assertRaises(AttributeError):
+            module.array
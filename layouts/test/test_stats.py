@@ -0,0 +1,85 @@
+from io import BytesIO
+from unittest import TestCase
+
+from ..primitives import Container, Circle
+from ..layouts import GridLayout, RandomLayout
+from ..stats import LayoutStats
+from .. import iter_layout
+
+
+class LayoutStatsTests(TestCase):
+    def test_phase(self):
+        calls = []
+        stats = LayoutStats(callback=lambda name, seconds: calls.append(name))
+        with stats.phase("a"):
+            pass
+        with stats.phase("a"):
+            pass
+        self.assertEquals(calls, ["a", "a"])
+        self.assertTrue(stats.times["a"] >= 0)
+
+    def test_iterate(self):
+        calls = []
+        stats = LayoutStats(callback=lambda name, seconds: calls.append(name))
+        self.assertEquals(list(stats.iterate("a", xrange(0, 3))), [0, 1, 2])
+        self.assertEquals(calls, ["a"])
+
+        items = stats.iterate("b", xrange(0, 3))
+        next(items)
+        items.close()
+        self.assertEquals(calls, ["a", "b"])
+        self.assertTrue(stats.times["b"] >= 0)
+
+    def test_count(self):
+        stats = LayoutStats()
+        stats.count("a")
+        stats.count("a", 2)
+        self.assertEquals(stats.as_dict(), {"times": {}, "counters": {"a": 3}})
+
+    def test_layout_phases(self):
+        stats = LayoutStats()
+        layout = GridLayout(Container(width=7, height=7), stats=stats)
+        layout.add_many([Circle(radius=1) for x in range(0, 3)])
+        layout.add(Circle(radius=1))
+        layout.save(BytesIO())
+
+        self.assertEquals(sorted(stats.times), ["arrange", "item_coordinates", "items_intersect", "render"])
+        self.assertEquals(stats.counters["layouts"], 2)
+        self.assertEquals(stats.counters["items"], 4)
+        # grid spacing guarantees items don't overlap
+        self.assertEquals(stats.counters["certified"], 2)
+        self.assertEquals(stats.counters["pair_checks"], 0)
+
+    def test_pair_checks(self):
+        stats = LayoutStats()
+        layout = RandomLayout(1, Container(width=20, height=3), seed=1, stats=stats)
+        layout.add_many([Circle(radius=1) for x in range(0, 4)])
+        self.assertTrue(stats.counters["pair_checks"] > 0)
+
+    def test_random_layout_candidates(self):
+        stats = LayoutStats()
+        layout = RandomLayout(1, Container(width=6, height=3), stats=stats)
+        layout.add(Circle(radius=1))
+        self.assertEquals(stats.counters["candidates"], 4)
+        self.assertTrue(stats.counters["candidates_left"] < 4)
+        self.assertIn("candidate_cleanup", stats.times)
+
+    def test_lazy_layout(self):
+        stats = LayoutStats()
+        list(iter_layout("horizontal_line", 100, 20, 5, 5, stats=stats))
+        self.assertEquals(stats.counters, {"layouts": 1, "items": 5})
+        self.assertEquals(sorted(stats.times), ["check", "item_coordinates"])
+
+        stats = LayoutStats()
+        list(iter_layout("grid", 100, 100, 3, 10, stats=stats))
+        self.assertEquals(sorted(stats.times), ["check", "item_coordinates"])
+
+    def test_check_phase(self):
+        stats = LayoutStats()
+        list(iter_layout("circle", 100, 100, 4, 5, stats=stats))
+        self.assertIn("check", stats.times)
+
+    def test_disabled(self):
+        layout = GridLayout(Container(width=100, height=100))
+        layout.add(Circle(radius=5))
+        self.assertEquals(layout.stats, None)
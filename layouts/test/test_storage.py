@@ -0,0 +1,94 @@
+from unittest import TestCase, skipIf
+
+from ..primitives import Container, Circle
+from ..layouts import HorizontalLineLayout, GridLayout, CircleLayout, RandomLayout
+from ..storage import ItemArray
+from ..errors import LayoutError
+from ..compat import numpy
+
+
+class ItemArrayTests(TestCase):
+    def test_append(self):
+        items = ItemArray([Circle(radius=1, x=1, y=2)])
+        items.append(Circle(radius=2, x=3, y=4))
+        self.assertEquals(len(items), 2)
+        self.assertEquals(items.as_tuples(), [(1, 2, 1), (3, 4, 2)])
+
+    def test_views(self):
+        items = ItemArray([Circle(radius=1, x=1, y=2), Circle(radius=2, x=3, y=4)])
+        view = items[-1]
+        self.assertEquals(view.as_tuple(), (3, 4, 2))
+        self.assertEquals(view.box_coordinates(), (1, 2, 5, 6))
+        view.x = 5
+        self.assertEquals(items.as_tuples(), [(1, 2, 1), (5, 4, 2)])
+        self.assertTrue(items[0].intersects_with(items[1]) is False)
+        self.assertEquals([item.as_tuple() for item in items], items.as_tuples())
+        with self.assertRaises(IndexError):
+            items[2]
+
+    def test_set_coordinates(self):
+        items = ItemArray([Circle(radius=1), Circle(radius=1)])
+        items.set_coordinates([(1, 1), (4, 1), (7, 1)])
+        self.assertEquals(items.as_tuples(), [(1, 1, 1), (4, 1, 1)])
+        self.assertEquals(list(items.box_coordinates()), [(0, 0, 2, 2), (3, 0, 5, 2)])
+
+    def test_extend_circles(self):
+        items = ItemArray([Circle(radius=1, x=1, y=2)])
+        items.extend_circles(2, 3)
+        self.assertEquals(items.as_tuples(), [(1, 2, 1), (0, 0, 3), (0, 0, 3)])
+
+    @skipIf(not numpy, "numpy not installed")
+    def test_set_coordinate_arrays(self):
+        items = ItemArray()
+        items.extend_circles(2, 1)
+        items.set_coordinate_arrays(numpy.array([1, 4, 7]), numpy.array([2, 2, 2]))
+        self.assertEquals(items.as_tuples(), [(1, 2, 1), (4, 2, 1)])
+
+    def test_circle_has_no_dict(self):
+        with self.assertRaises(AttributeError):
+            Circle(radius=1).color = "red"
+
+
+class CompactLayoutTests(TestCase):
+    def test_same_as_objects(self):
+        container = Container(width=100, height=100)
+        for cls, num_items, radius in [(HorizontalLineLayout, 4, 5), (GridLayout, 3, 10), (CircleLayout, 6, 4)]:
+            l1 = cls(container)
+            l1.add_many([Circle(radius=radius) for x in range(0, num_items)])
+            l2 = cls(container, compact=True)
+            l2.add_many([Circle(radius=radius) for x in range(0, num_items)])
+            self.assertEquals(l1.as_tuples(), l2.as_tuples())
+
+    def test_add_circles(self):
+        # enough items for the vectorized path
+        container = Container(width=5000, height=200)
+        for cls, num_items, radius in [(HorizontalLineLayout, 1500, 1), (GridLayout, 1200, 1), (CircleLayout, 6, 4)]:
+            l1 = cls(container)
+            l1.add_many([Circle(radius=radius) for x in range(0, num_items)])
+            for compact in (False, True):
+                l2 = cls(container, compact=compact)
+                l2.add_circles(num_items, radius)
+                self.assertEquals(l1.as_tuples(), l2.as_tuples())
+
+        layout = RandomLayout(2, Container(width=100, height=100), compact=True, seed=1)
+        layout.add_circles(10, 2)
+        self.assertEquals(len(layout.items), 10)
+        self.assertFalse(layout.items_intersect())
+
+    def test_errors(self):
+        layout = HorizontalLineLayout(Container(width=3, height=3), compact=True)
+        with self.assertRaises(LayoutError) as e:
+            layout.add(Circle(radius=2))
+        self.assertEquals(e.exception.message, "item doesn't fit in the container")
+
+        layout = GridLayout(Container(width=7, height=7), compact=True)
+        layout.add(Circle(radius=2))
+        with self.assertRaises(LayoutError) as e:
+            layout.add(Circle(radius=1))
+        self.assertEquals(e.exception.message, "overlapping items")
+
+    def test_random_layout(self):
+        layout = RandomLayout(5, Container(width=100, height=100), compact=True)
+        layout.add_many([Circle(radius=5) for x in range(0, 10)])
+        self.assertEquals(len(layout.as_tuples()), 10)
+        self.assertFalse(layout.items_intersect())
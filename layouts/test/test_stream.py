@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from .. import iter_layout, grid_layout, circle_layout
+from ..errors import LayoutError
+
+
+class IterLayoutTests(TestCase):
+    def test_horizontal_line(self):
+        items = iter_layout("horizontal_line", 100, 20, 5, 5)
+        self.assertEquals(next(items), (10, 9, 5))
+        self.assertEquals(list(items), [(30, 9, 5), (50, 9, 5), (70, 9, 5), (90, 9, 5)])
+
+    def test_same_as_layout_functions(self):
+        self.assertEquals(list(iter_layout("grid", 100, 100, 3, 4)), grid_layout(100, 100, 3, radius=4))
+        self.assertEquals(list(iter_layout("circle", 70, 50, 3, 4)), circle_layout(70, 50, 3, radius=4))
+
+    def test_random(self):
+        items = list(iter_layout("random", 100, 100, 10, 5))
+        self.assertEquals(len(items), 10)
+
+    def test_error_raised_before_iteration(self):
+        with self.assertRaises(LayoutError):
+            iter_layout("horizontal_line", 3, 3, 2, 1)
+        with self.assertRaises(LayoutError):
+            iter_layout("circle", 9, 9, 3, 1)
@@ -1,12 +1,23 @@
-from argparse import ArgumentParser
+import sys
+import json
+
+from argparse import ArgumentParser, FileType
+from multiprocessing import Pool, cpu_count
 
 import layouts
 
-from layouts import horizontal_line_layout, grid_layout, circle_layout, random_layout
+from layouts import horizontal_line_layout, grid_layout, circle_layout, random_layout, RandomLayout
+from layouts.render import FORMATS, TILED_FORMATS, render, guess_format
+from layouts.errors import LayoutError
+from layouts.deadline import Deadline
+from layouts.stats import LayoutStats, NO_PHASE
+from layouts.output import FORMATS as OUTPUT_FORMATS, iter_write
 
 
 DEFAULT_RADIUS = 10  # px
 
+DEFAULT_IMAGE = "plot.bmp"
+
 LAYOUT_FUNCTION_MAP = {
     "horizontal_line": horizontal_line_layout,
     "grid": grid_layout,
@@ -17,18 +28,140 @@ LAYOUT_FUNCTION_MAP = {
 LAYOUT_TYPES = LAYOUT_FUNCTION_MAP.keys()
 
 
+def validate_job(job):
+    """
+    Raise ValueError if job isn't a valid job description, see
+    run_job().
+    """
+    if not isinstance(job, dict):
+        raise ValueError("job must be a JSON object")
+    if job.get("type") not in LAYOUT_TYPES:
+        raise ValueError("type must be one of %s" % ", ".join(LAYOUT_TYPES))
+
+    for key, minimum in (("width", 1), ("height", 1), ("num_items", 0), ("radius", 1)):
+        value = job.get(key)
+        if key == "radius" and value is None:
+            continue
+        if type(value) not in (int, long) or value < minimum:
+            raise ValueError("%s must be an integer of at least %d" % (key, minimum))
+
+    timeout = job.get("timeout")
+    if timeout is not None and (not isinstance(timeout, (int, long, float)) or timeout < 0):
+        raise ValueError("timeout must be a non-negative number")
+    if job.get("engine") is not None and job["engine"] not in RandomLayout.ENGINES:
+        raise ValueError("engine must be one of %s" % ", ".join(RandomLayout.ENGINES))
+
+
+def run_job(job):
+    """
+    Returns items of the layout described by job, a dict with keys
+    type, width, height, num_items and optionally radius, timeout in
+    seconds, and seed and engine for random layouts.
+    """
+    validate_job(job)
+    layout_function = LAYOUT_FUNCTION_MAP[job["type"]]
+    kwargs = {"radius": job.get("radius") or DEFAULT_RADIUS}
+    if job.get("timeout") is not None:
+        kwargs["deadline"] = Deadline(job["timeout"])
+    if job["type"] == "random":
+        for key in ("seed", "engine"):
+            if job.get(key) is not None:
+                kwargs[key] = job[key]
+
+    return layout_function(job["width"], job["height"], job["num_items"], **kwargs)
+
+
+def run_batch_job(numbered_line):
+    """
+    Runs job from a JSON line and returns result record with the index
+    of the line and either the items or the error message.
+    """
+    index, line = numbered_line
+    try:
+        return {"index": index, "items": run_job(json.loads(line))}
+    except LayoutError as e:
+        return {"index": index, "error": str(e)}
+    except (ValueError, KeyError, TypeError, AssertionError) as e:
+        return {"index": index, "error": "invalid job: %s" % e}
+
+
+def run_batch(lines, out, workers=1, ordered=True):
+    """
+    Runs jobs from JSON lines and writes results as JSON lines to out,
+    in input order or as they complete.
+    """
+    jobs = ((i, line) for i, line in enumerate(lines) if line.strip())
+
+    if workers == 1:
+        results = (run_batch_job(job) for job in jobs)
+        pool = None
+    else:
+        pool = Pool(workers)
+        imap = pool.imap if ordered else pool.imap_unordered
+        results = imap(run_batch_job, jobs, chunksize=8)
+
+    try:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
 if __name__ == "__main__":
     parser = ArgumentParser(description="Arrange circles of RADIUS in the selected layout.")
-    parser.add_argument("width", type=int, help="container width")
-    parser.add_argument("height", type=int, help="container height")
-    parser.add_argument("num_items", type=int, help="number of items to add to container")
+    parser.add_argument("width", type=int, nargs="?", help="container width")
+    parser.add_argument("height", type=int, nargs="?", help="container height")
+    parser.add_argument("num_items", type=int, nargs="?", help="number of items to add to container")
     parser.add_argument("-t", "--layout-type", choices=LAYOUT_TYPES, default=LAYOUT_TYPES[0],
                         help="type of layout to generate. default: %s" % LAYOUT_TYPES[0])
     parser.add_argument("-r", "--radius", type=int, default=DEFAULT_RADIUS,
                         help="radius of the items. default: %dpx" % DEFAULT_RADIUS)
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMATS[0],
+                        help="format of the printed coordinates. default: %s" % OUTPUT_FORMATS[0])
+    parser.add_argument("-i", "--image", default=DEFAULT_IMAGE,
+                        help="file to save the layout image to. default: %s" % DEFAULT_IMAGE)
+    parser.add_argument("--image-format", choices=FORMATS,
+                        help="format of the layout image. default: guessed from the file extension")
+    parser.add_argument("--no-render", action="store_true",
+                        help="only print coordinates, don't create the image")
+    parser.add_argument("--tiled", action="store_true",
+                        help="rasterize the image tile by tile into a memory-mapped file, "
+                             "for very large containers. bmp and pbm only")
+    parser.add_argument("--stats", action="store_true",
+                        help="print time spent in each phase and work counters to stderr as JSON")
+    parser.add_argument("--batch", type=FileType("r"), metavar="JOBS",
+                        help="run layout jobs from JSON lines file (- for stdin) and print results as JSON lines")
+    parser.add_argument("-w", "--workers", type=int, default=cpu_count(),
+                        help="number of worker processes in batch mode. default: %d" % cpu_count())
+    parser.add_argument("--unordered", action="store_true",
+                        help="print batch results as they complete instead of in input order")
     args = parser.parse_args()
 
-    layout_function = LAYOUT_FUNCTION_MAP[args.layout_type]
+    if args.batch:
+        run_batch(args.batch, sys.stdout, args.workers, ordered=not args.unordered)
+        sys.exit()
+
+    if args.num_items is None:
+        parser.error("width, height and num_items are required")
+    if args.no_render:
+        args.image = None
+    if args.tiled and args.image and (args.image_format or guess_format(args.image)) not in TILED_FORMATS:
+        parser.error("--tiled supports only %s images" % ", ".join(TILED_FORMATS))
+
+    stats = LayoutStats() if args.stats else None
+    items = layouts.iter_layout(args.layout_type, args.width, args.height, args.num_items, args.radius,
+                                stats=stats)
+
+    # items are streamed to stdout while the image is being drawn
+    items = iter_write(items, sys.stdout, args.format, args.num_items)
+    if args.image:
+        with stats.phase("render") if stats else NO_PHASE:
+            render(items, args.width, args.height, args.image, args.image_format, args.tiled)
+    else:
+        for item in items:
+            pass
 
-    layouts.radius = args.radius
-    print(layout_function(args.width, args.height, args.num_items))
+    if stats:
+        sys.stderr.write(json.dumps(stats.as_dict(), sort_keys=True) + "\n")
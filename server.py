@@ -0,0 +1,282 @@
+import json
+import time
+import threading
+import urllib2
+
+from argparse import ArgumentParser
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+from multiprocessing import Pool, TimeoutError, cpu_count
+
+from layouts.errors import LayoutError, LayoutTimeout
+
+from main import run_job, validate_job
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8040
+
+# random layouts are CPU heavy and are computed in worker processes
+POOL_LAYOUT_TYPES = ("random", )
+
+
+class Stats(object):
+    """
+    Request counters and latency of the server.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def finish(self, latency, error=False):
+        with self.lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.errors += int(error)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def reject(self):
+        with self.lock:
+            self.rejected += 1
+
+    def as_dict(self):
+        with self.lock:
+            uptime = time.time() - self.started
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "throughput": self.requests / uptime if uptime else 0.0,
+                "mean_latency": self.total_latency / self.requests if self.requests else 0.0,
+                "max_latency": self.max_latency,
+            }
+
+
+class RequestQueue(object):
+    """
+    Admits at most max_pending requests at a time. Up to max_queued
+    more requests wait in order of arrival, at most queue_timeout
+    seconds, for one of them to finish. The rest are rejected.
+    """
+    def __init__(self, max_pending, max_queued=0, queue_timeout=5):
+        self.condition = threading.Condition()
+        self.max_pending = max_pending
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.pending = 0
+        self.queued = 0
+
+    def acquire(self):
+        """
+        Returns True when the request can be processed, False if it's
+        rejected.
+        """
+        with self.condition:
+            if self.pending < self.max_pending and not self.queued:
+                self.pending += 1
+                return True
+            if self.queued >= self.max_queued:
+                return False
+
+            self.queued += 1
+            try:
+                expires = time.time() + self.queue_timeout
+                while self.pending >= self.max_pending:
+                    remaining = expires - time.time()
+                    if remaining <= 0:
+                        return False
+                    self.condition.wait(remaining)
+                self.pending += 1
+                return True
+            finally:
+                self.queued -= 1
+
+    def release(self):
+        with self.condition:
+            self.pending -= 1
+            self.condition.notify()
+
+
+class LayoutServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP/JSON layout server.
+
+    Each request is handled in its own thread, random layouts are sent
+    to a pool of worker processes. At most max_pending requests are
+    processed at a time, up to max_queued more wait up to queue_timeout
+    seconds for their turn, the rest are rejected with 503.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, max_pending=64, timeout=30, max_queued=64, queue_timeout=5):
+        HTTPServer.__init__(self, address, LayoutRequestHandler)
+
+        self.pool = Pool(workers or cpu_count())
+        self.queue = RequestQueue(max_pending, max_queued, queue_timeout)
+        self.timeout = timeout
+        self.stats = Stats()
+
+    def run_job(self, job):
+        if job["type"] in POOL_LAYOUT_TYPES:
+            # workers give up on their own instead of running on after
+            # the request timed out
+            job["timeout"] = min([job.get("timeout") or self.timeout, self.timeout])
+            return self.pool.apply_async(run_job, (job, )).get(self.timeout + 1)
+
+        return run_job(job)
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.pool.terminate()
+        self.pool.join()
+
+
+class LayoutRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /layout with JSON object {type, width, height, num_items,
+    radius, seed, timeout} returns {"items": [[x, y, r], ...]} or {"error": ...}.
+
+    GET /stats returns server counters.
+    """
+    def do_GET(self):
+        if self.path != "/stats":
+            return self.send_json(404, {"error": "not found"})
+
+        self.send_json(200, dict(self.server.stats.as_dict(), queued=self.server.queue.queued))
+
+    def do_POST(self):
+        if self.path != "/layout":
+            return self.send_json(404, {"error": "not found"})
+
+        server = self.server
+        body = self.rfile.read(int(self.headers.getheader("content-length", 0)))
+        if not server.queue.acquire():
+            server.stats.reject()
+            return self.send_json(503, {"error": "server busy"})
+
+        started = time.time()
+        server.stats.start()
+        status = 500
+        try:
+            job = json.loads(body)
+            validate_job(job)
+            response = {"items": server.run_job(job)}
+            status = 200
+        except (TimeoutError, LayoutTimeout):
+            status, response = 504, {"error": "layout timed out"}
+        except LayoutError as e:
+            status, response = 422, {"error": str(e)}
+        except (ValueError, KeyError, TypeError, AssertionError) as e:
+            status, response = 400, {"error": "invalid request: %s" % e}
+        except Exception as e:
+            status, response = 500, {"error": "internal error: %s" % e}
+        finally:
+            server.queue.release()
+            server.stats.finish(time.time() - started, error=status != 200)
+
+        self.send_json(status, response)
+
+    def send_json(self, status, data):
+        body = json.dumps(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def load_test(url, job, num_requests, concurrency):
+    """
+    Sends num_requests layout requests from concurrency threads and
+    returns dict with throughput and latency percentiles.
+    """
+    body = json.dumps(job)
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    remaining = iter(xrange(0, num_requests))
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+
+            started = time.time()
+            try:
+                request = urllib2.Request(url + "/layout", body, {"Content-Type": "application/json"})
+                urllib2.urlopen(request).read()
+                ok = True
+            except urllib2.URLError:
+                ok = False
+
+            with lock:
+                latencies.append(time.time() - started)
+                failures[0] += int(not ok)
+
+    started = time.time()
+    threads = [threading.Thread(target=worker) for i in range(0, concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+    return {
+        "requests": num_requests,
+        "failures": failures[0],
+        "concurrency": concurrency,
+        "throughput": num_requests / elapsed,
+        "p50": percentile(0.5),
+        "p99": percentile(0.99),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Serve layouts over HTTP/JSON on localhost.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="default: %s" % DEFAULT_HOST)
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT, help="default: %d" % DEFAULT_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=cpu_count(),
+                        help="number of worker processes for random layouts. default: %d" % cpu_count())
+    parser.add_argument("--max-pending", type=int, default=64,
+                        help="number of requests processed at a time, more are queued. default: 64")
+    parser.add_argument("--max-queued", type=int, default=64,
+                        help="number of requests waiting for their turn, more are rejected. default: 64")
+    parser.add_argument("--queue-timeout", type=float, default=5,
+                        help="seconds a request waits in the queue before it's rejected. default: 5")
+    parser.add_argument("--load-test", metavar="URL",
+                        help="instead of serving, send random layout requests to the server at URL")
+    parser.add_argument("-n", "--requests", type=int, default=1000, help="load test requests. default: 1000")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="load test concurrency. default: 8")
+    args = parser.parse_args()
+
+    if args.load_test:
+        job = {"type": "random", "width": 200, "height": 200, "num_items": 20, "radius": 10}
+        print(json.dumps(load_test(args.load_test.rstrip("/"), job, args.requests, args.concurrency)))
+    else:
+        server = LayoutServer((args.host, args.port), args.workers, args.max_pending,
+                              max_queued=args.max_queued, queue_timeout=args.queue_timeout)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()